@@ -0,0 +1,195 @@
+import os
+import time
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from Core.utils import normalize
+from Core.content_store import ContentStore
+from Core.decrypt_cache import DecryptCache
+
+logger = logging.getLogger("BatchExtractor")
+
+
+def output_dir_names(items: List[Dict]) -> Dict[str, str]:
+    """Map item id -> output folder name, the title unless several items share it"""
+    titles = Counter(normalize(item['title']) for item in items)
+    return {
+        item['item_id']: normalize(item['title']) if titles[normalize(item['title'])] == 1
+        else f"{normalize(item['title'])}_{item['item_id']}"
+        for item in items
+    }
+
+
+def extract_item(item: Dict, item_output_dir: str, store_dir: str = None, link_mode: str = "auto",
+                 decrypt_cache_file: str = None, filters: Dict = None) -> Dict:
+    """Extract every lpk file of one workshop item. Runs inside a worker process."""
+    from Core.lpk_loader import LpkLoader
+
+    start = time.time()
+    os.makedirs(item_output_dir, exist_ok=True)
+    store = ContentStore(store_dir, link_mode) if store_dir else None
+    decrypt_cache = DecryptCache(decrypt_cache_file) if decrypt_cache_file else None
+
+    config_file = item['config_files'][0] if item['config_files'] else None
+    errors = []
+    try:
+        for lpk_file in item['lpk_files']:
+            try:
+                # nobody can answer the fileId prompt in a worker, failures raise LpkError
+                loader = LpkLoader(lpk_file, config_file, store, decrypt_cache, interactive=False)
+                loader.set_filter(**(filters or {}))
+                loader.extract(item_output_dir)
+            except Exception as e:
+                errors.append(f"{lpk_file}: {e!r}")
+    finally:
+        if decrypt_cache is not None:
+            decrypt_cache.close()
+
+    return {
+        'item_id': item['item_id'],
+        'title': item['title'],
+        'output_dir': item_output_dir,
+        'lpk_files': len(item['lpk_files']),
+        'errors': errors,
+        'ok': not errors,
+        'size': item.get('size', 0),
+        'elapsed': time.time() - start,
+        'dedup': store.report() if store else None,
+        'cache_hits': decrypt_cache.hits if decrypt_cache else 0,
+    }
+
+
+def plan_item(item: Dict, item_output_dir: str, store_dir: str = None, link_mode: str = "auto",
+              decrypt_cache_file: str = None, filters: Dict = None) -> Dict:
+    """Dry run of extract_item: plan every lpk file of one item without writing anything."""
+    from Core.lpk_loader import LpkLoader
+
+    start = time.time()
+    config_file = item['config_files'][0] if item['config_files'] else None
+    errors = []
+    plans = []
+    for lpk_file in item['lpk_files']:
+        try:
+            loader = LpkLoader(lpk_file, config_file, interactive=False)
+            loader.set_filter(**(filters or {}))
+            plans.append(loader.plan(item_output_dir))
+        except Exception as e:
+            errors.append(f"{lpk_file}: {e!r}")
+
+    return {
+        'item_id': item['item_id'],
+        'title': item['title'],
+        'output_dir': item_output_dir,
+        'lpk_files': len(item['lpk_files']),
+        'errors': errors,
+        'ok': not errors,
+        'size': item.get('size', 0),
+        'elapsed': time.time() - start,
+        'files': [f for plan in plans for f in plan['files']],
+        'bytes': sum(plan['bytes'] for plan in plans),
+        'estimated_time': sum(plan['estimated_time'] for plan in plans),
+        'dedup': None,
+        'cache_hits': 0,
+    }
+
+
+class BatchExtractor:
+    """Extract many workshop items concurrently in a bounded process pool.
+
+    Items are scheduled largest-first by ``item['size']`` so that a big archive
+    picked up last does not keep the whole batch waiting.
+    """
+
+    def __init__(self, output_base_dir: str, max_workers: Optional[int] = None,
+                 store_dir: str = None, link_mode: str = "auto", decrypt_cache_file: str = None,
+                 filters: Dict = None):
+        self.output_base_dir = output_base_dir
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        # with a store_dir identical payloads are written once and linked into place
+        self.store_dir = store_dir
+        self.link_mode = link_mode
+        # members found in this cache are linked from an earlier output instead of decrypted
+        self.decrypt_cache_file = os.path.abspath(decrypt_cache_file) if decrypt_cache_file else None
+        # keyword arguments of LpkLoader.set_filter applied to every lpk
+        self.filters = filters
+        self.executor = None
+        self.cancelled = False
+
+    def run(self, items: List[Dict], on_result: Callable[[Dict, int, int, float], None] = None,
+            dry_run: bool = False) -> List[Dict]:
+        """Extract ``items`` and return one result dict per item in completion order.
+
+        ``on_result(result, done, total, throughput)`` is called from the calling
+        thread after each item, ``throughput`` being the aggregated bytes/s so far.
+        With ``dry_run`` the items are only planned, see ``LpkLoader.plan``.
+        """
+        worker = plan_item if dry_run else extract_item
+        ordered = sorted(items, key=lambda item: item.get('size', 0), reverse=True)
+        total = len(ordered)
+        results = []
+        if not ordered:
+            return results
+
+        start = time.time()
+        done_bytes = 0
+        names = output_dir_names(ordered)
+        workers = min(self.max_workers, total)
+        logger.info(f"Extracting {total} items with {workers} workers")
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                self.executor.submit(
+                    worker, item, os.path.join(self.output_base_dir, names[item['item_id']]),
+                    self.store_dir, self.link_mode, self.decrypt_cache_file, self.filters
+                ): item
+                for item in ordered
+            }
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                item = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # the worker itself died, e.g. out of memory
+                    result = {
+                        'item_id': item['item_id'],
+                        'title': item['title'],
+                        'output_dir': os.path.join(self.output_base_dir, names[item['item_id']]),
+                        'lpk_files': len(item['lpk_files']),
+                        'errors': [repr(e)],
+                        'ok': False,
+                        'size': item.get('size', 0),
+                        'elapsed': 0.0,
+                        'dedup': None,
+                        'cache_hits': 0,
+                    }
+                results.append(result)
+                done_bytes += result['size']
+                throughput = done_bytes / max(time.time() - start, 1e-6)
+                if on_result:
+                    on_result(result, len(results), total, throughput)
+                if self.cancelled:
+                    break
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        return results
+
+    @staticmethod
+    def dedup_report(results: List[Dict]) -> Optional[Dict[str, int]]:
+        """Content store statistics summed over all items, None without a store"""
+        reports = [result['dedup'] for result in results if result.get('dedup')]
+        return ContentStore.merge_reports(reports) if reports else None
+
+    def estimated_time(self, results: List[Dict]) -> float:
+        """Wall time estimate of a planned batch, spreading the work over the workers"""
+        workers = max(min(self.max_workers, len(results)), 1)
+        return max([result['estimated_time'] for result in results] +
+                   [sum(result['estimated_time'] for result in results) / workers])
+
+    def cancel(self):
+        """Stop scheduling new items; items already running are finished."""
+        self.cancelled = True
@@ -0,0 +1,106 @@
+import os
+import sys
+import shutil
+import logging
+from hashlib import sha256
+from typing import Dict
+
+logger = logging.getLogger("ContentStore")
+
+# ioctl request number of FICLONE on Linux (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+
+LINK_MODES = ["reflink", "hardlink", "copy"]
+
+
+def reflink(src: str, dest: str):
+    """Copy-on-write clone ``src`` to ``dest``, raises OSError where unsupported"""
+    if not sys.platform.startswith("linux"):
+        raise OSError("reflink is only supported on Linux")
+    import fcntl
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        try:
+            fcntl.ioctl(fdest.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdest.close()
+            os.remove(dest)
+            raise
+
+
+def link_file(src: str, dest: str, modes=LINK_MODES) -> str:
+    """Make ``dest`` hold the content of ``src`` using the first mode that works"""
+    if os.path.lexists(dest):
+        # never write through an existing hardlink into the store
+        os.remove(dest)
+    for mode in modes:
+        try:
+            if mode == "reflink":
+                reflink(src, dest)
+            elif mode == "hardlink":
+                os.link(src, dest)
+            else:
+                shutil.copyfile(src, dest)
+            return mode
+        except OSError as e:
+            logger.debug(f"{mode} {src} -> {dest} failed: {e}")
+    raise OSError(f"could not link {src} to {dest}")
+
+
+class ContentStore:
+    """Content-addressed store for decrypted payloads shared across extractions.
+
+    A payload is written once under ``objects/<sha256>``; every output file with
+    the same content is a reflink (copy-on-write clone) or hardlink of it, with a
+    plain copy as the last resort. ``link_mode`` restricts the modes tried.
+    """
+
+    def __init__(self, root: str, link_mode: str = "auto"):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.modes = LINK_MODES if link_mode == "auto" else [link_mode]
+        self.stats = {"files": 0, "unique": 0, "bytes": 0, "bytes_saved": 0,
+                      "reflink": 0, "hardlink": 0, "copy": 0}
+        self.warned_copy = False
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put(self, data: bytes, dest: str) -> str:
+        """Store ``data`` and materialize it at ``dest``, returns the object path"""
+        obj = self.object_path(sha256(data).hexdigest())
+        self.stats["files"] += 1
+        self.stats["bytes"] += len(data)
+        stored = os.path.exists(obj) and os.path.getsize(obj) == len(data)
+        if not stored:
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            tmp = f"{obj}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, obj)
+            self.stats["unique"] += 1
+        # a copy of a stored object takes as much disk as writing it out again
+        if self.link(obj, dest) != "copy" and stored:
+            self.stats["bytes_saved"] += len(data)
+        return obj
+
+    def link(self, obj: str, dest: str) -> str:
+        """Materialize a stored object at ``dest``, returns the link mode used"""
+        mode = link_file(obj, dest, self.modes)
+        self.stats[mode] += 1
+        if mode == "copy" and not self.warned_copy:
+            self.warned_copy = True
+            logger.warning(f"Content store {self.root} falls back to copying, "
+                           f"it costs disk space instead of saving it")
+        return mode
+
+    def report(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    @staticmethod
+    def merge_reports(reports) -> Dict[str, int]:
+        total: Dict[str, int] = {}
+        for report in reports:
+            for key, value in report.items():
+                total[key] = total.get(key, 0) + value
+        return total
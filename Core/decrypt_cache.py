@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger("DecryptCache")
+
+
+class DecryptCache:
+    """Persistent map of encrypted lpk members to their decrypted output on disk.
+
+    Identical members of different archives share the zip CRC32 and size, and the
+    same lpk id yields the same key, so ``(key, crc, size)`` identifies the
+    decrypted payload. An entry is only trusted while the recorded output file
+    still has the same size and mtime. SQLite keeps the file safe to share
+    between the worker processes of a batch extraction: every statement commits
+    on its own so no worker holds the write lock while it decrypts, and a
+    locked database only costs a cache miss.
+    """
+
+    def __init__(self, cache_file: str = "decrypt_cache.db"):
+        self.cache_file = os.path.join(os.getcwd(), cache_file)
+        # autocommit, WAL lets readers continue while another worker writes
+        self.db = sqlite3.connect(self.cache_file, timeout=30, isolation_level=None)
+        self._execute("PRAGMA journal_mode=WAL")
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS members ("
+            "key TEXT, crc INTEGER, size INTEGER, path TEXT, suffix TEXT, mtime INTEGER, "
+            "PRIMARY KEY (key, crc, size))"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _execute(self, sql: str, params=()) -> Optional[sqlite3.Cursor]:
+        try:
+            return self.db.execute(sql, params)
+        except sqlite3.OperationalError as e:
+            # another worker holds the lock for too long, do without the cache this time
+            logger.warning(f"Decrypt cache unavailable: {e}")
+            return None
+
+    @staticmethod
+    def _key(key: int) -> str:
+        # genkey() yields sign-extended 64 bit values that don't fit an SQLite integer
+        return format(key & 0xffffffffffffffff, "x")
+
+    def lookup(self, key: int, crc: int, size: int) -> Optional[Tuple[str, str]]:
+        """Return ``(path, suffix)`` of a still intact previous output, else None"""
+        cursor = self._execute(
+            "SELECT path, suffix, mtime FROM members WHERE key=? AND crc=? AND size=?",
+            (self._key(key), crc, size),
+        )
+        row = cursor.fetchone() if cursor is not None else None
+        if row is None:
+            self.misses += 1
+            return None
+        path, suffix, mtime = row
+        try:
+            st = os.stat(path)
+            valid = st.st_size == size and st.st_mtime_ns == mtime
+        except OSError:
+            valid = False
+        if not valid:
+            self._execute("DELETE FROM members WHERE key=? AND crc=? AND size=?", (self._key(key), crc, size))
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path, suffix
+
+    def put(self, key: int, crc: int, size: int, path: str, suffix: str):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?, ?, ?)",
+            (self._key(key), crc, size, os.path.abspath(path), suffix, mtime),
+        )
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,100 @@
+import os
+import json
+import logging
+from hashlib import md5
+from typing import Dict, Optional
+
+from Core.utils import hashed_filename
+
+logger = logging.getLogger("ExtractJournal")
+
+
+class ExtractJournal:
+    """Append-only journal of recovered entries, used to resume an interrupted extraction.
+
+    The journal lives in the output directory, one file per lpk, and holds one JSON
+    record per line: a header identifying the archive and ``file`` records for every
+    written payload. The name mapping needs no record, a resumed run rebuilds it
+    while it skips the recovered entries. The journal is removed once the
+    extraction has completed.
+    """
+
+    def __init__(self, outputdir: str, lpkpath: str) -> None:
+        self.outputdir = outputdir
+        self.path = os.path.join(outputdir, f".lpkjournal_{hashed_filename(os.path.abspath(lpkpath))[:12]}")
+        st = os.stat(lpkpath)
+        self.header = {"lpk": os.path.basename(lpkpath), "size": st.st_size, "mtime": int(st.st_mtime)}
+        self.files: Dict[str, dict] = {}
+        self.load()
+        self.fp = None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        records = []
+        with open(self.path, "r", encoding="utf8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # a torn last line from a killed process
+                    break
+        if not records or records[0].get("header") != self.header:
+            logger.info("journal belongs to another archive version, starting over")
+            os.remove(self.path)
+            return
+        for rec in records[1:]:
+            if rec.get("type") == "file":
+                self.files[rec["entry"]] = rec
+        logger.info(f"resuming from journal, {len(self.files)} entries already recovered")
+
+    def _append(self, rec: dict):
+        if self.fp is None:
+            os.makedirs(self.outputdir, exist_ok=True)
+            new = not os.path.exists(self.path)
+            self.fp = open(self.path, "a", encoding="utf8")
+            if new:
+                self.fp.write(json.dumps({"header": self.header}) + "\n")
+        self.fp.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.fp.flush()
+
+    def lookup(self, entry: str, output: str) -> Optional[str]:
+        """Return the suffix of ``entry`` if it was already written to ``output`` intact."""
+        rec = self.files.get(entry)
+        if rec is None or rec["output"] != os.path.relpath(output, self.outputdir):
+            return None
+        path = output + rec["suffix"]
+        try:
+            if os.path.getsize(path) != rec["size"]:
+                return None
+            with open(path, "rb") as f:
+                if md5(f.read()).hexdigest() != rec["md5"]:
+                    return None
+        except OSError:
+            return None
+        return rec["suffix"]
+
+    def record_file(self, entry: str, output: str, suffix: str, data: bytes):
+        rec = {
+            "type": "file",
+            "entry": entry,
+            "output": os.path.relpath(output, self.outputdir),
+            "suffix": suffix,
+            "size": len(data),
+            "md5": md5(data).hexdigest(),
+        }
+        self.files[entry] = rec
+        self._append(rec)
+
+    def close(self):
+        if self.fp is not None:
+            self.fp.close()
+            self.fp = None
+
+    def finish(self):
+        """The extraction completed, nothing left to resume"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -2,36 +2,77 @@ from __future__ import unicode_literals
 from typing import Tuple
 import zipfile
 import json
-from typing import List
+from typing import List, Optional
 from Core.utils import *
+from Core.extract_journal import ExtractJournal
+from Core.content_store import ContentStore, link_file
+from Core.decrypt_cache import DecryptCache
 import logging
+import time
 import os
 
 logger = logging.getLogger("lpkLoder")
 
+
+class LpkError(Exception):
+    """An lpk that cannot be read or decrypted, raised instead of exiting when not interactive"""
+
+def read_mlve_config(lpkfile: zipfile.ZipFile) -> dict:
+    """Read config.mlve from an opened lpk, raises KeyError if it is missing"""
+    try:
+        config_mlve_raw = lpkfile.read(hashed_filename("config.mlve")).decode()
+    except KeyError:
+        config_mlve_raw = lpkfile.read("config.mlve").decode('utf-8-sig')
+    return json.loads(config_mlve_raw)
+
+def read_lpk_summary(lpkpath: str) -> dict:
+    """Summarize an lpk (type, character names, costume count) without decrypting anything"""
+    with zipfile.ZipFile(lpkpath) as lpkfile:
+        mlve_config = read_mlve_config(lpkfile)
+    charas = mlve_config.get("list") or []
+    return {
+        "type": mlve_config.get("type"),
+        "characters": [chara.get("character", "") for chara in charas if chara.get("character")],
+        "costumes": sum(len(chara.get("costume", [])) for chara in charas),
+    }
+
+def measure_decrypt_throughput(sample_size: int = 64 * 1024) -> float:
+    """Bytes per second decrypt() manages on this machine"""
+    start = time.perf_counter()
+    decrypt(0, bytes(sample_size))
+    return sample_size / max(time.perf_counter() - start, 1e-6)
+
 class LpkLoader():
-    def __init__(self, lpkpath, configpath) -> None:
+    def __init__(self, lpkpath, configpath, store: ContentStore = None, decrypt_cache: DecryptCache = None,
+                 interactive: bool = True) -> None:
         self.lpkpath = lpkpath
+        # the command line asks for a missing fileId and exits on errors, library users get an LpkError
+        self.interactive = interactive
         self.configpath = configpath
+        # optional content-addressed store shared between extractions
+        self.store = store
+        # optional cache of members already decrypted by a previous extraction
+        self.decrypt_cache = decrypt_cache
         self.lpkType = None
         self.encrypted = "true"
         self.trans = {}
         self.entrys = {}
+        self.journal = None
+        # list of planned files while plan() walks the model graph
+        self.planned = None
+        self.planned_models = None
+        # selective extraction, see set_filter()
+        self.characters = None
+        self.costumes = None
+        self.types = None
         self.load_lpk()
     
     def load_lpk(self):
         self.lpkfile = zipfile.ZipFile(self.lpkpath)
         try:
-            config_mlve_raw = self.lpkfile.read(hashed_filename("config.mlve")).decode()
-        except KeyError:
-            try:
-                config_mlve_raw = self.lpkfile.read("config.mlve").decode('utf-8-sig')
-            except:
-                logger.fatal("Failed to retrieve lpk config!")
-                exit(0)
-
-
-        self.mlve_config = json.loads(config_mlve_raw)
+            self.mlve_config = read_mlve_config(self.lpkfile)
+        except (KeyError, UnicodeDecodeError):
+            self.fail("Failed to retrieve lpk config!")
 
         logger.debug(f"mlve config:\n {self.mlve_config}")
         self.lpkType = self.mlve_config.get("type")
@@ -42,26 +83,93 @@ class LpkLoader():
     def load_config(self):
         self.config = json.loads(open(self.configpath, "r", encoding="utf8").read())
     
+    def set_filter(self, characters: List[str] = None, costumes: List[int] = None, types: List[str] = None):
+        """Only extract some characters, costume indexes or payload types, None keeps everything.
+
+        Characters match the character name (or the workshop title) case-insensitively,
+        types are output suffixes like ``png`` or ``.moc3``. An excluded payload is never
+        decrypted, its type is sniffed from the first bytes only; model JSONs keep
+        referring to it by the name it would have been extracted as.
+        """
+        self.characters = {c.lower() for c in characters} if characters else None
+        self.costumes = set(costumes) if costumes else None
+        self.types = {"." + t.lower().lstrip(".") for t in types} if types else None
+
+    def plan(self, outputdir: str) -> dict:
+        """Dry run of extract(): list the files it would write without writing any.
+
+        Only model JSONs are decrypted; payload types are sniffed from their first
+        SNIFF_SIZE bytes and sizes come from the zip directory. ``estimated_time``
+        extrapolates the measured decrypt throughput to all payload bytes.
+        ``models`` maps the path of every model JSON to its translated content.
+        """
+        trans, entrys = self.trans, self.entrys
+        self.trans, self.entrys = {}, {}
+        self.planned = []
+        self.planned_models = {}
+        try:
+            self.extract(outputdir)
+            files, models = self.planned, self.planned_models
+        finally:
+            self.trans, self.entrys = trans, entrys
+            self.planned = None
+            self.planned_models = None
+
+        decrypt_bytes = sum(f["size"] for f in files if f["decrypt"])
+        throughput = measure_decrypt_throughput()
+        return {
+            "lpk": self.lpkpath,
+            "type": self.lpkType,
+            "files": files,
+            "bytes": sum(f["size"] for f in files),
+            "decrypt_bytes": decrypt_bytes,
+            "throughput": throughput,
+            "estimated_time": decrypt_bytes / throughput,
+            "models": models,
+        }
+
+    def plan_file(self, entry: str, path: str, size: int, decrypt: bool = True):
+        self.planned.append({"entry": entry, "path": path, "size": size, "decrypt": decrypt})
+
     def extract(self, outputdir: str):
         if self.lpkType in ["STD2_0", "STM_1_0"]:
-            for chara in self.mlve_config["list"]:
-                if self.lpkType == "STM_1_0" and hasattr(self, 'config') and 'title' in self.config:
-                    chara_name = self.config["title"]
-                else:
-                    chara_name = chara["character"] if chara["character"] != "" else "character"
-                subdir =  os.path.join(outputdir, normalize(chara_name))
-                safe_mkdir(subdir)
-
-                for i in range(len(chara["costume"])):
-                    logger.info(f"extracting {chara_name}_costume_{i}")
-                    self.extract_costume(chara["costume"][i], subdir)
-
-                # replace encryped filename to decrypted filename in entrys(model.json)
-                for name in self.entrys:
-                    out_s: str = self.entrys[name]
-                    for k in self.trans:
-                        out_s = out_s.replace(k, self.trans[k])
-                    open(os.path.join(subdir, name), "w", encoding="utf8").write(out_s)
+            if self.planned is None:
+                self.journal = ExtractJournal(outputdir, self.lpkpath)
+            try:
+                for chara in self.mlve_config["list"]:
+                    if self.lpkType == "STM_1_0" and hasattr(self, 'config') and 'title' in self.config:
+                        chara_name = self.config["title"]
+                    else:
+                        chara_name = chara["character"] if chara["character"] != "" else "character"
+                    if self.characters is not None and not {chara["character"].lower(), chara_name.lower()} & self.characters:
+                        logger.info(f"skipping character {chara_name}, excluded by filter")
+                        continue
+                    subdir =  os.path.join(outputdir, normalize(chara_name))
+                    if self.planned is None:
+                        safe_mkdir(subdir)
+
+                    for i in range(len(chara["costume"])):
+                        if self.costumes is not None and i not in self.costumes:
+                            continue
+                        logger.info(f"extracting {chara_name}_costume_{i}")
+                        self.extract_costume(chara["costume"][i], subdir)
+
+                    # replace encryped filename to decrypted filename in entrys(model.json)
+                    for name in self.entrys:
+                        out_s: str = self.entrys[name]
+                        for k in self.trans:
+                            out_s = out_s.replace(k, self.trans[k])
+                        if self.planned is not None:
+                            self.plan_file(name, os.path.join(subdir, name), len(out_s.encode("utf8")), False)
+                            self.planned_models[os.path.join(subdir, name)] = out_s
+                            continue
+                        open(os.path.join(subdir, name), "w", encoding="utf8").write(out_s)
+                if self.journal is not None:
+                    self.journal.finish()
+            finally:
+                if self.journal is not None:
+                    self.journal.close()
+                    self.journal = None
         else:
             try:
                 print("Deprecated/unknown lpk format detected. Attempting with STD_1_0 format...")
@@ -69,14 +177,25 @@ class LpkLoader():
                 self.encrypted = self.mlve_config.get("encrypt", "true")
                 if self.encrypted == "false":
                     print("lpk is not encrypted, extracting all files...")
+                    if self.planned is not None:
+                        for info in self.lpkfile.infolist():
+                            if not info.is_dir():
+                                self.plan_file(info.filename, os.path.join(outputdir, info.filename), info.file_size, False)
+                        return
                     self.lpkfile.extractall(outputdir)
                     return
                 # For STD_1_0 and earlier
                 for file in self.lpkfile.namelist():
                     if os.path.splitext(file)[-1] == '':
                         continue
+                    if self.types is not None and os.path.splitext(file)[-1].lower() not in self.types:
+                        continue
                     subdir = os.path.join(outputdir, os.path.dirname(file))
                     outputFilePath = os.path.join(subdir, os.path.basename(file))
+                    if self.planned is not None:
+                        decrypt = os.path.splitext(file)[-1] not in [".json", ".mlve", ".txt"]
+                        self.plan_file(file, outputFilePath, self.lpkfile.getinfo(file).file_size, decrypt)
+                        continue
                     safe_mkdir(subdir)
                     if os.path.splitext(file)[-1] in [".json", ".mlve", ".txt"]:
                         print(f"Extracting {file} -> {outputFilePath}")
@@ -87,9 +206,14 @@ class LpkLoader():
                         with open(outputFilePath, "wb") as outputFile:
                             outputFile.write(decryptedData)
             except:
-                logger.fatal(f"Failed to decrypt {self.lpkpath}, possibly wrong/unsupported format.")
-                exit(0)
+                self.fail(f"Failed to decrypt {self.lpkpath}, possibly wrong/unsupported format.")
     
+    def fail(self, message: str):
+        if not self.interactive:
+            raise LpkError(message)
+        logger.fatal(message)
+        exit(0)
+
     def extract_costume(self, costume: dict, dir: str):
         if costume["path"] == "":
             return
@@ -187,22 +311,86 @@ class LpkLoader():
                 success = True
                 break
             if not success:
+                if not self.interactive:
+                    raise LpkError(f"Cannot find the fileId of {self.lpkpath}")
                 print("steam workshop fileid is usually a foler under PATH_TO_YOUR_STEAM/steamapps/workshop/content/616720/([0-9]+)")
                 fileid = input("auto fix failed, please input fileid manually: ")
                 self.config["fileId"] = fileid
                 try:
                     self.decrypt_file(filename).decode(encoding="utf8")
                 except UnicodeDecodeError:
-                    logger.fatal("decrypt failed!")
-                    exit(0)
+                    self.fail("decrypt failed!")
 
-    def recovery(self, filename, output) -> Tuple[bytes, str]:
+    def recovery(self, filename, output) -> Tuple[Optional[bytes], str]:
+        if self.types is not None:
+            suffix = self.sniff_suffix(filename)
+            if suffix.lower() not in self.types:
+                logger.info(f"skipping {filename} -> {output+suffix}, excluded by filter")
+                return None, suffix
+        if self.planned is not None:
+            suffix = self.sniff_suffix(filename)
+            self.plan_file(filename, output + suffix, self.lpkfile.getinfo(filename).file_size)
+            return None, suffix
+        if self.journal is not None:
+            suffix = self.journal.lookup(filename, output)
+            if suffix is not None:
+                print(f"skipping {filename}, already recovered -> {output+suffix}")
+                return None, suffix
+        if self.decrypt_cache is not None:
+            suffix = self.recover_cached(filename, output)
+            if suffix is not None:
+                return None, suffix
         ret = self.decrypt_file(filename)
         suffix = guess_type(ret)
         print(f"recovering {filename} -> {output+suffix}")
-        open(output + suffix, "wb").write(ret)
+        self.write_output(output + suffix, ret)
+        if self.journal is not None:
+            self.journal.record_file(filename, output, suffix, ret)
+        if self.decrypt_cache is not None:
+            info = self.lpkfile.getinfo(filename)
+            self.decrypt_cache.put(self.getkey(filename), info.CRC, info.file_size, output + suffix, suffix)
         return ret, suffix
 
+    def recover_cached(self, filename, output) -> Optional[str]:
+        """Link or copy ``filename`` from a previous extraction, returns its suffix on a cache hit"""
+        info = self.lpkfile.getinfo(filename)
+        hit = self.decrypt_cache.lookup(self.getkey(filename), info.CRC, info.file_size)
+        if hit is None:
+            return None
+        src, suffix = hit
+        dest = output + suffix
+        data = None
+        if self.store is not None:
+            # through the store, so the file is counted and linked to a store object
+            # instead of to an unrelated earlier output
+            data = open(src, "rb").read()
+            self.store.put(data, dest)
+        elif not (os.path.exists(dest) and os.path.samefile(src, dest)):
+            # never hardlink, editing the earlier output would change this one as well
+            link_file(src, dest, ["reflink", "copy"])
+        print(f"reusing {src} -> {dest}")
+        if self.journal is not None:
+            if data is None:
+                data = open(dest, "rb").read()
+            self.journal.record_file(filename, output, suffix, data)
+        return suffix
+
+    def sniff_suffix(self, filename) -> str:
+        """Output suffix of ``filename`` from its first bytes, without decrypting the rest"""
+        with self.lpkfile.open(filename) as f:
+            prefix = f.read(SNIFF_SIZE)
+        complete = len(prefix) == self.lpkfile.getinfo(filename).file_size
+        return sniff_type(self.decrypt_data(filename, prefix), complete)
+
+    def write_output(self, path: str, data: bytes):
+        if self.store is not None:
+            self.store.put(data, path)
+            return
+        # a previous run may have linked this file into a content store
+        if os.path.exists(path) and os.stat(path).st_nlink > 1:
+            os.remove(path)
+        open(path, "wb").write(data)
+
     def getkey(self, file: str):
         if self.lpkType == "STM_1_0" and self.mlve_config["encrypt"] != "true":
             return 0
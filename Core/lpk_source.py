@@ -0,0 +1,92 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from Core.lpk_loader import LpkLoader
+
+logger = logging.getLogger("LpkSource")
+
+
+class LpkSource:
+    """Read the files of an lpk by their extracted path without extracting it.
+
+    The output layout comes from ``LpkLoader.plan``, which only decrypts model
+    JSONs. Payloads are decrypted when first requested and kept in an LRU cache
+    bounded by ``cache_bytes``, so previewing a large pack only decrypts what the
+    viewer actually fetches. Construction decrypts every model JSON, so build it
+    off the GUI thread.
+    """
+
+    def __init__(self, lpkpath: str, configpath: str = None, cache_bytes: int = 64 * 1024 * 1024):
+        if configpath is None:
+            # workshop items keep config.json next to the lpk
+            candidate = os.path.join(os.path.dirname(lpkpath), "config.json")
+            configpath = candidate if os.path.exists(candidate) else None
+        self.lpkpath = lpkpath
+        st = os.stat(lpkpath)
+        # contents are fixed for as long as the archive is unchanged
+        self.signature = (st.st_size, st.st_mtime_ns)
+        # raises LpkError rather than prompting for a fileId or exiting
+        self.loader = LpkLoader(lpkpath, configpath, interactive=False)
+        plan = self.loader.plan("")
+        self.files = {self._key(f["path"]): f for f in plan["files"]}
+        self.models = {self._key(path): text.encode("utf8") for path, text in plan["models"].items()}
+        self.cache_bytes = cache_bytes
+        self.cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return path.replace("\\", "/").lstrip("/")
+
+    def model_jsons(self) -> List[str]:
+        """Paths of the model JSONs, the entry model of the first character first"""
+        return list(self.models)
+
+    def size(self, path: str) -> Optional[int]:
+        path = self._key(path)
+        if path in self.models:
+            return len(self.models[path])
+        f = self.files.get(path)
+        return f["size"] if f else None
+
+    def changed(self) -> bool:
+        """Whether the archive was modified since it was planned"""
+        try:
+            st = os.stat(self.lpkpath)
+        except OSError:
+            return True
+        return (st.st_size, st.st_mtime_ns) != self.signature
+
+    def read(self, path: str) -> Optional[bytes]:
+        """Content of the file that extraction would write to ``path``, None if there is none"""
+        path = self._key(path)
+        if path in self.models:
+            return self.models[path]
+        f = self.files.get(path)
+        if f is None:
+            return None
+        with self.lock:
+            data = self.cache.get(path)
+            if data is not None:
+                self.cache.move_to_end(path)
+                return data
+            logger.debug(f"decrypting {f['entry']} -> {path}")
+            if f["decrypt"]:
+                data = self.loader.decrypt_file(f["entry"])
+            else:
+                data = self.loader.lpkfile.read(f["entry"])
+            self._remember(path, data)
+        return data
+
+    def _remember(self, path: str, data: bytes):
+        if len(data) > self.cache_bytes:
+            return
+        self.cache[path] = data
+        self.cached_bytes += len(data)
+        while self.cached_bytes > self.cache_bytes:
+            _, old = self.cache.popitem(last=False)
+            self.cached_bytes -= len(old)
@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ModelDiscovery")
+
+# model JSONs are small and start with their file references, motion and physics JSONs can be huge
+VALIDATE_PREFIX = 16 * 1024
+# folders whose listing is remembered
+FOLDER_CACHE_SIZE = 4096
+
+# candidate ranks, lower is tried first
+RANK_MODEL3 = 0   # *.model3.json, Cubism 3+
+RANK_MODEL = 1    # *.model.json, Cubism 2
+RANK_NAMED = 2    # any other *model*.json
+RANK_JSON = 3     # any other .json, last resort
+
+_FILE_REFERENCES = re.compile(rb'"FileReferences"\s*:\s*\{')
+_MOC = re.compile(rb'"Moc"\s*:\s*"')
+_V2_MODEL = re.compile(rb'"model"\s*:\s*"')
+_V2_TEXTURES = re.compile(rb'"textures"\s*:\s*\[')
+
+
+def rank_model_json_name(name: str) -> Optional[int]:
+    """Rank of a file name as model JSON candidate, None if it is no JSON at all"""
+    name = name.lower()
+    if not name.endswith(".json"):
+        return None
+    if name.endswith(".model3.json"):
+        return RANK_MODEL3
+    if name.endswith(".model.json"):
+        return RANK_MODEL
+    if "model" in name:
+        return RANK_NAMED
+    return RANK_JSON
+
+
+def is_model_json_name(name: str) -> bool:
+    rank = rank_model_json_name(name)
+    return rank is not None and rank < RANK_JSON
+
+
+def validate_model_json(path: str, prefix_size: int = VALIDATE_PREFIX) -> bool:
+    """Whether ``path`` is a Cubism 2 or 3+ model JSON, reading at most ``prefix_size`` bytes"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(prefix_size + 1)
+    except OSError:
+        return False
+
+    if len(head) <= prefix_size:
+        # the whole file, check it exactly
+        try:
+            data = json.loads(head.decode("utf-8-sig"))
+        except ValueError:
+            return False
+        if not isinstance(data, dict):
+            return False
+        refs = data.get("FileReferences")
+        if isinstance(refs, dict) and isinstance(refs.get("Moc"), str):
+            return True
+        return isinstance(data.get("model"), str) and isinstance(data.get("textures"), list)
+
+    return bool((_FILE_REFERENCES.search(head) and _MOC.search(head)) or
+                (_V2_MODEL.search(head) and _V2_TEXTURES.search(head)))
+
+
+class _Folder:
+    """One scandir listing of a folder and the candidates validated so far.
+
+    Rewriting a file in place leaves the folder's mtime alone, so every verdict
+    is kept with the file's (size, mtime) and checked again when those change.
+    """
+
+    def __init__(self, path: str, mtime: int):
+        self.path = path
+        self.mtime = mtime
+        self.subdirs: List[str] = []
+        # (rank, name) ordered by rank, then name
+        self.candidates = []
+        # name -> ((size, mtime_ns), valid)
+        self.valid: Dict[str, Tuple[Tuple[int, int], bool]] = {}
+        with os.scandir(path) as it:
+            for entry in sorted(it, key=lambda entry: entry.name):
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        self.subdirs.append(entry.name)
+                        continue
+                except OSError:
+                    continue
+                rank = rank_model_json_name(entry.name)
+                if rank is not None:
+                    self.candidates.append((rank, entry.name))
+        self.candidates.sort(key=lambda candidate: candidate[0])
+
+    def is_valid(self, name: str) -> bool:
+        path = os.path.join(self.path, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        signature = (st.st_size, st.st_mtime_ns)
+        cached = self.valid.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        valid = validate_model_json(path)
+        self.valid[name] = (signature, valid)
+        return valid
+
+    def models(self, max_rank: int = RANK_JSON) -> List[str]:
+        return [name for rank, name in self.candidates if rank <= max_rank and self.is_valid(name)]
+
+
+_folders: "OrderedDict[str, _Folder]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _folder(path: str) -> Optional[_Folder]:
+    """Listing of ``path``, memoized until the folder's mtime changes"""
+    path = os.path.abspath(path)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        folder = _folders.get(path)
+        if folder is not None and folder.mtime == mtime:
+            _folders.move_to_end(path)
+            return folder
+    try:
+        folder = _Folder(path, mtime)
+    except OSError as e:
+        logger.debug(f"Cannot scan {path}: {e}")
+        return None
+    with _lock:
+        _folders[path] = folder
+        _folders.move_to_end(path)
+        while len(_folders) > FOLDER_CACHE_SIZE:
+            _folders.popitem(last=False)
+    return folder
+
+
+def find_model_json(folder: str) -> Optional[str]:
+    """Path of the model JSON of ``folder``, None if it has none.
+
+    *.model3.json wins over *.model.json, then other *model*.json names, then
+    any JSON. The folder is listed once and the listing is remembered until its
+    mtime changes, i.e. a file is added, removed or renamed. A candidate is
+    validated again when its own size or mtime changes.
+    """
+    listing = _folder(folder)
+    if listing is None:
+        return None
+    for _, name in listing.candidates:
+        if listing.is_valid(name):
+            return os.path.join(folder, name)
+    return None
+
+
+def scan_models(root: str, max_depth: int = 8) -> List[str]:
+    """Every model JSON below ``root`` as a "/" separated path relative to it.
+
+    Only *model*.json names are considered. Folders and files in name order.
+    """
+    models = []
+    stack = [("", 0)]
+    while stack:
+        relpath, depth = stack.pop()
+        listing = _folder(os.path.join(root, relpath))
+        if listing is None:
+            continue
+        prefix = relpath + "/" if relpath else ""
+        models.extend(prefix + name for name in listing.models(RANK_NAMED))
+        if depth < max_depth:
+            stack.extend((prefix + name, depth + 1) for name in reversed(listing.subdirs))
+    return models
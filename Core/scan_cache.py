@@ -0,0 +1,90 @@
+import os
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("WorkshopScanCache")
+
+CACHE_VERSION = 2
+
+
+class WorkshopScanCache:
+    """Persistent cache of workshop scan results, keyed by item directory.
+
+    An entry stays valid while the item directory's mtime and the size/mtime of
+    every LPK and config file recorded for it are unchanged. Directories without
+    LPK files are cached as well so they are not walked again on every scan.
+    """
+
+    def __init__(self, cache_file: str = "workshop_cache.json"):
+        self.cache_file = os.path.join(os.getcwd(), cache_file)
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load cache from file"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("items", {})
+        except Exception as e:
+            logger.error(f"Failed to load workshop cache: {e}")
+
+    def save(self) -> bool:
+        """Save cache to file if anything changed"""
+        if not self.dirty:
+            return True
+        try:
+            tmp = self.cache_file + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "items": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_file)
+            self.dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save workshop cache: {e}")
+            return False
+
+    def _signature(self, item_path: str, files: Iterable[str]) -> Optional[List]:
+        try:
+            signature = [os.stat(item_path).st_mtime_ns]
+            for path in files:
+                st = os.stat(path)
+                signature.append([st.st_size, st.st_mtime_ns])
+            return signature
+        except OSError:
+            return None
+
+    def _files(self, item: Optional[Dict]) -> List[str]:
+        if item is None:
+            return []
+        return item['lpk_files'] + item['config_files']
+
+    def lookup(self, item_path: str):
+        """Return ``(hit, item)``; ``item`` is None for directories cached as empty"""
+        entry = self.entries.get(item_path)
+        if entry is None:
+            return False, None
+        item = entry["item"]
+        if entry["signature"] != self._signature(item_path, self._files(item)):
+            return False, None
+        return True, item
+
+    def put(self, item_path: str, item: Optional[Dict]):
+        """Store the scan result of an item directory"""
+        signature = self._signature(item_path, self._files(item))
+        if signature is None:
+            return
+        self.entries[item_path] = {"signature": signature, "item": item}
+        self.dirty = True
+
+    def prune(self, item_paths: Iterable[str]):
+        """Drop entries for item directories that no longer exist"""
+        keep = set(item_paths)
+        for path in [p for p in self.entries if p not in keep]:
+            del self.entries[path]
+            self.dirty = True
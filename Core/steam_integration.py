@@ -1,12 +1,25 @@
 import os
 import json
 import logging
-import winreg
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple
 from pathlib import Path
 
+from Core.lpk_loader import read_lpk_summary
+from Core.scan_cache import WorkshopScanCache
+from Core.vdf import load_vdf
+from Core.steam_platform import find_steam_roots, library_folders
+
 logger = logging.getLogger("SteamIntegration")
 
+# Common preview image names and extensions
+PREVIEW_NAMES = (
+    'preview', 'thumbnail', 'icon', 'cover', 'image',
+    'screenshot', 'pic', 'photo', 'img'
+)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+DESCRIPTION_FILES = ['description.txt', 'readme.txt', 'info.txt']
+
 class SteamIntegration:
     """Steam Workshop integration for automatic LPK discovery"""
     
@@ -14,33 +27,19 @@ class SteamIntegration:
         self.steam_path = None
         self.workshop_path = None
         self.game_id = "616720"  # Girls' Frontline game ID
+        self.workshop_manifest: Dict[str, Dict] = {}
+        self._title_cache: Dict[str, Optional[str]] = {}
         
     def find_steam_installation(self) -> Optional[str]:
-        """Find Steam installation path from registry"""
-        try:
-            # Try to find Steam installation path from registry
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam") as key:
-                steam_path = winreg.QueryValueEx(key, "InstallPath")[0]
-                if os.path.exists(steam_path):
-                    self.steam_path = steam_path
-                    logger.info(f"Found Steam installation at: {steam_path}")
-                    return steam_path
-        except (FileNotFoundError, OSError, winreg.error):
-            pass
-            
-        # Try common installation paths
-        common_paths = [
-            r"C:\Program Files (x86)\Steam",
-            r"C:\Program Files\Steam",
-            r"D:\Steam",
-            r"E:\Steam"
-        ]
-        
-        for path in common_paths:
-            if os.path.exists(os.path.join(path, "steam.exe")):
-                self.steam_path = path
-                logger.info(f"Found Steam installation at: {path}")
-                return path
+        """Find Steam installation path (registry on Windows, well-known folders elsewhere)
+
+        With several installations, the first one holding the workshop content wins.
+        """
+        roots = find_steam_roots()
+        if roots:
+            self.steam_path = next((root for root in roots if self._workshop_path_in(root)), roots[0])
+            logger.info(f"Found Steam installation at: {self.steam_path}")
+            return self.steam_path
                 
         logger.warning("Steam installation not found")
         return None
@@ -51,56 +50,44 @@ class SteamIntegration:
         if not steam_path:
             return None
 
+        workshop_path = self._workshop_path_in(steam_path)
+        if workshop_path:
+            self.workshop_path = workshop_path
+            logger.info(f"Found workshop path: {workshop_path}")
+            return workshop_path
+
+        logger.warning(f"Workshop path not found: {os.path.join(steam_path, 'steamapps', 'workshop', 'content', self.game_id)}")
+        return None
+
+    def _workshop_path_in(self, steam_path: str) -> Optional[str]:
         primary = os.path.join(steam_path, "steamapps", "workshop", "content", self.game_id)
         if os.path.exists(primary):
-            self.workshop_path = primary
-            logger.info(f"Found workshop path: {primary}")
             return primary
 
         for lib in self._get_library_paths(steam_path):
             candidate = os.path.join(lib, "workshop", "content", self.game_id)
             if os.path.exists(candidate):
-                self.workshop_path = candidate
-                logger.info(f"Found workshop path: {candidate}")
                 return candidate
 
         shared = os.path.join(steam_path, "steamapps", "common", "Live2DViewerEX", "shared", "workshop")
         if os.path.exists(shared):
-            self.workshop_path = shared
-            logger.info(f"Found workshop path: {shared}")
             return shared
-
-        logger.warning(f"Workshop path not found: {primary}")
         return None
 
     def _get_library_paths(self, steam_path: str) -> List[str]:
-        libs = []
-        vdf = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
-        if not os.path.exists(vdf):
-            return libs
-        try:
-            with open(vdf, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-            for line in content.splitlines():
-                line = line.strip()
-                if '"path"' in line:
-                    parts = line.split('"')
-                    if len(parts) >= 4:
-                        p = parts[3]
-                        if os.path.exists(p):
-                            libs.append(os.path.join(p, "steamapps"))
-                else:
-                    tokens = line.split('"')
-                    if len(tokens) >= 3 and tokens[1].isdigit():
-                        p = tokens[2].strip()
-                        if p and os.path.exists(p):
-                            libs.append(os.path.join(p, "steamapps"))
-        except Exception:
-            pass
-        return libs
+        return library_folders(steam_path)
     
-    def scan_workshop_items(self, workshop_path: str = None) -> List[Dict]:
-        """Scan workshop directory for LPK files"""
+    def scan_workshop_items(self, workshop_path: str = None,
+                            on_item: Callable[[Dict], None] = None,
+                            max_workers: int = 8,
+                            cache: WorkshopScanCache = None) -> List[Dict]:
+        """Scan workshop directory for LPK files
+
+        Item directories are scanned concurrently; ``on_item`` is called with each
+        item as soon as it is found, before the full list is returned. With a
+        ``cache``, unchanged item directories are served from it and only new or
+        modified ones are walked again.
+        """
         if workshop_path is None:
             workshop_path = self.workshop_path or self.get_workshop_path()
             
@@ -109,157 +96,262 @@ class SteamIntegration:
             return []
             
         workshop_items = []
+        # Parsed once per scan and shared by all items
+        self.workshop_manifest = self.load_workshop_manifest(workshop_path)
+        self._title_cache = {}
         
         try:
-            for item_id in os.listdir(workshop_path):
-                item_path = os.path.join(workshop_path, item_id)
-                if not os.path.isdir(item_path):
-                    continue
-                    
-                # Look for LPK files in the item directory
-                lpk_files = []
-                config_files = []
-                
-                for root, dirs, files in os.walk(item_path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if file.lower().endswith('.lpk'):
-                            lpk_files.append(file_path)
-                        elif file.lower() == 'config.json':
-                            config_files.append(file_path)
-                
-                if lpk_files:
-                    # Try to get workshop item info
-                    item_info = self.get_workshop_item_info(item_id, item_path)
-                    
-                    # Search for preview images
-                    preview_image = self.find_preview_image(item_path)
-                    
-                    workshop_items.append({
-                        'item_id': item_id,
-                        'item_path': item_path,
-                        'lpk_files': lpk_files,
-                        'config_files': config_files,
-                        'title': item_info.get('title', f'Workshop Item {item_id}'),
-                        'description': item_info.get('description', ''),
-                        'size': self.get_directory_size(item_path),
-                        'preview_image': preview_image
-                    })
+            with os.scandir(workshop_path) as it:
+                item_dirs = [(entry.name, entry.path) for entry in it if entry.is_dir()]
+            order = {item_id: i for i, (item_id, _) in enumerate(item_dirs)}
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self.scan_item_cached, item_id, item_path, cache)
+                           for item_id, item_path in item_dirs]
+                for future in as_completed(futures):
+                    try:
+                        item = future.result()
+                    except Exception as e:
+                        logger.debug(f"Error scanning workshop item: {e}")
+                        continue
+                    if item is None:
+                        continue
+                    workshop_items.append(item)
+                    if on_item:
+                        on_item(item)
+
+            workshop_items.sort(key=lambda item: order[item['item_id']])
+
+            if cache is not None:
+                cache.prune(item_path for _, item_path in item_dirs)
+                cache.save()
                     
         except Exception as e:
             logger.error(f"Error scanning workshop items: {e}")
             
         logger.info(f"Found {len(workshop_items)} workshop items with LPK files")
         return workshop_items
+
+    def snapshot_workshop(self, workshop_path: str) -> Dict[str, int]:
+        """Map item id -> item directory mtime for a cheap change check of the workshop
+
+        Steam downloads an item into a staging folder and moves it into place, so
+        an added or updated item changes the mtime of its own directory.
+        """
+        snapshot = {}
+        try:
+            with os.scandir(workshop_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            snapshot[entry.name] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"Could not list workshop directory: {e}")
+        return snapshot
+
+    @staticmethod
+    def diff_snapshots(old: Dict[str, int], new: Dict[str, int]) -> Tuple[List[str], List[str], List[str]]:
+        """Return (added, modified, removed) item ids between two snapshots"""
+        added = [item_id for item_id in new if item_id not in old]
+        modified = [item_id for item_id in new if item_id in old and new[item_id] != old[item_id]]
+        removed = [item_id for item_id in old if item_id not in new]
+        return added, modified, removed
+
+    def scan_item_cached(self, item_id: str, item_path: str,
+                         cache: Optional[WorkshopScanCache]) -> Optional[Dict]:
+        """Scan a workshop item unless ``cache`` holds an up-to-date result for it"""
+        if cache is not None:
+            hit, item = cache.lookup(item_path)
+            if hit:
+                return item
+        item = self.scan_item(item_id, item_path)
+        if cache is not None:
+            cache.put(item_path, item)
+        return item
+
+    def scan_item(self, item_id: str, item_path: str) -> Optional[Dict]:
+        """Scan a single workshop item directory, None if it holds no LPK files"""
+        found = self._walk_item(item_path)
+        if not found['lpk_files']:
+            return None
+
+        # Summarize config.mlve of every LPK so the list can show it without extracting
+        lpk_type = None
+        characters = []
+        for lpk_file in found['lpk_files']:
+            try:
+                summary = read_lpk_summary(lpk_file)
+            except Exception as e:
+                logger.debug(f"Could not read lpk config of {lpk_file}: {e}")
+                continue
+            lpk_type = lpk_type or summary['type']
+            characters += [c for c in summary['characters'] if c not in characters]
+
+        # Try to get workshop item info
+        item_info = self.get_workshop_item_info(
+            item_id, item_path, found['description_file'], found['config_files']
+        )
+
+        return {
+            'item_id': item_id,
+            'item_path': item_path,
+            'lpk_files': found['lpk_files'],
+            'config_files': found['config_files'],
+            'title': item_info.get('title', f'Workshop Item {item_id}'),
+            'description': item_info.get('description', ''),
+            'time_updated': item_info.get('time_updated', 0),
+            'size': found['size'],
+            'preview_image': found['preview_image'],
+            'lpk_type': lpk_type,
+            'characters': characters
+        }
+
+    def _walk_item(self, item_path: str) -> Dict:
+        """Collect LPKs, configs, total size and preview image of an item in one traversal"""
+        lpk_files = []
+        config_files = []
+        description_files = {}
+        total_size = 0
+        # (rank, depth, path); rank 0 is an image named like a preview, rank 1 any image
+        preview = None
+
+        stack = [(item_path, 0)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append((entry.path, depth + 1))
+                                continue
+                            if not entry.is_file():
+                                continue
+                            total_size += entry.stat().st_size
+                        except OSError:
+                            continue
+
+                        name = entry.name.lower()
+                        if name.endswith('.lpk'):
+                            lpk_files.append(entry.path)
+                        elif name == 'config.json':
+                            config_files.append(entry.path)
+                        elif depth == 0 and name in DESCRIPTION_FILES:
+                            description_files[name] = entry.path
+                        elif depth < 2 and name.endswith(IMAGE_EXTENSIONS):
+                            rank = 0 if any(key in name for key in PREVIEW_NAMES) else 1
+                            if preview is None or (rank, depth) < preview[:2]:
+                                preview = (rank, depth, entry.path)
+            except OSError as e:
+                logger.debug(f"Could not scan {path}: {e}")
+
+        lpk_files.sort()
+        config_files.sort()
+        description_file = next(
+            (description_files[name] for name in DESCRIPTION_FILES if name in description_files), None
+        )
+        return {
+            'lpk_files': lpk_files,
+            'config_files': config_files,
+            'description_file': description_file,
+            'size': total_size,
+            'preview_image': preview[2] if preview else None,
+        }
     
-    def get_workshop_item_info(self, item_id: str, item_path: str) -> Dict:
+    def load_workshop_manifest(self, workshop_path: str = None) -> Dict[str, Dict]:
+        """Parse appworkshop_<game>.acf into a dict keyed by workshop item id
+
+        The ACF sits in the ``steamapps/workshop`` folder of the library that holds
+        the content directory, so it is looked up next to ``workshop_path`` first.
+        """
+        candidates = []
+        if workshop_path:
+            candidates.append(os.path.join(
+                os.path.dirname(os.path.dirname(workshop_path)), f"appworkshop_{self.game_id}.acf"
+            ))
+        if self.steam_path:
+            candidates.append(os.path.join(
+                self.steam_path, "steamapps", "workshop", f"appworkshop_{self.game_id}.acf"
+            ))
+
+        for appworkshop_path in candidates:
+            if not os.path.exists(appworkshop_path):
+                continue
+            try:
+                acf = load_vdf(appworkshop_path).get("AppWorkshop", {})
+            except Exception as e:
+                logger.debug(f"Could not read workshop info: {e}")
+                continue
+            manifest: Dict[str, Dict] = {}
+            for section in ("WorkshopItemsInstalled", "WorkshopItemDetails"):
+                for item_id, details in acf.get(section, {}).items():
+                    if isinstance(details, dict):
+                        manifest.setdefault(item_id, {}).update(details)
+            logger.info(f"Loaded {len(manifest)} entries from {appworkshop_path}")
+            return manifest
+        return {}
+
+    def _read_config_title(self, config_file: str) -> Optional[str]:
+        if config_file in self._title_cache:
+            return self._title_cache[config_file]
+        title = None
+        try:
+            with open(config_file, 'r', encoding='utf-8-sig', errors='ignore') as f:
+                title = json.load(f).get('title') or None
+        except Exception as e:
+            logger.debug(f"Could not read title from {config_file}: {e}")
+        self._title_cache[config_file] = title
+        return title
+
+    def get_workshop_item_info(self, item_id: str, item_path: str, description_file: str = None,
+                               config_files: List[str] = None) -> Dict:
         """Get workshop item information from Steam files"""
         info = {'title': f'Workshop Item {item_id}', 'description': ''}
         
-        # Try to read workshop item info from Steam's appworkshop file
-        if self.steam_path:
-            appworkshop_path = os.path.join(
-                self.steam_path, "steamapps", "workshop", f"appworkshop_{self.game_id}.acf"
-            )
-            
-            if os.path.exists(appworkshop_path):
-                try:
-                    with open(appworkshop_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        # Simple parsing for workshop item info
-                        if item_id in content:
-                            # This is a simplified approach - Steam's ACF format is more complex
-                            info['title'] = f'Workshop Item {item_id}'
-                except Exception as e:
-                    logger.debug(f"Could not read workshop info: {e}")
+        # Workshop details (update time, size) from the appworkshop manifest loaded for this scan
+        details = self.workshop_manifest.get(item_id)
+        if details:
+            try:
+                info['time_updated'] = int(details.get('timeupdated', 0))
+            except ValueError:
+                pass
+        
+        # The title of a workshop lpk is stored in its config.json
+        for config_file in config_files or []:
+            title = self._read_config_title(config_file)
+            if title:
+                info['title'] = title
+                break
         
         # Try to find a description file in the item directory
-        desc_files = ['description.txt', 'readme.txt', 'info.txt']
-        for desc_file in desc_files:
-            desc_path = os.path.join(item_path, desc_file)
-            if os.path.exists(desc_path):
-                try:
-                    with open(desc_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        info['description'] = (content[:200] + '...') if len(content) > 200 else content
-                        break
-                except Exception:
-                    pass
+        if description_file is None:
+            for desc_file in DESCRIPTION_FILES:
+                desc_path = os.path.join(item_path, desc_file)
+                if os.path.exists(desc_path):
+                    description_file = desc_path
+                    break
+        if description_file is not None:
+            try:
+                with open(description_file, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+                    info['description'] = (content[:200] + '...') if len(content) > 200 else content
+            except Exception:
+                pass
         
         return info
     
     def find_preview_image(self, item_path: str) -> Optional[str]:
         """Find preview image in workshop item directory"""
-        # Common preview image names and extensions
-        preview_names = [
-            'preview', 'thumbnail', 'icon', 'cover', 'image', 
-            'screenshot', 'pic', 'photo', 'img'
-        ]
-        image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
-        
-        try:
-            # Search in the root directory first
-            for file in os.listdir(item_path):
-                file_lower = file.lower()
-                file_path = os.path.join(item_path, file)
-                
-                # Check if it's an image file
-                if any(file_lower.endswith(ext) for ext in image_extensions):
-                    # Check if filename contains preview-related keywords
-                    if any(name in file_lower for name in preview_names):
-                        if os.path.isfile(file_path):
-                            logger.debug(f"Found preview image: {file_path}")
-                            return file_path
-            
-            # If no preview found in root, search subdirectories (limited depth)
-            for root, dirs, files in os.walk(item_path):
-                # Limit search depth to avoid performance issues
-                depth = root[len(item_path):].count(os.sep)
-                if depth >= 2:
-                    dirs[:] = []  # Don't go deeper
-                    continue
-                    
-                for file in files:
-                    file_lower = file.lower()
-                    file_path = os.path.join(root, file)
-                    
-                    # Check if it's an image file with preview-related name
-                    if any(file_lower.endswith(ext) for ext in image_extensions):
-                        if any(name in file_lower for name in preview_names):
-                            logger.debug(f"Found preview image in subdirectory: {file_path}")
-                            return file_path
-            
-            # If still no preview found, return the first image file found
-            for root, dirs, files in os.walk(item_path):
-                depth = root[len(item_path):].count(os.sep)
-                if depth >= 2:
-                    dirs[:] = []
-                    continue
-                    
-                for file in files:
-                    file_lower = file.lower()
-                    if any(file_lower.endswith(ext) for ext in image_extensions):
-                        file_path = os.path.join(root, file)
-                        logger.debug(f"Using first available image as preview: {file_path}")
-                        return file_path
-                        
-        except Exception as e:
-            logger.debug(f"Error searching for preview image in {item_path}: {e}")
-            
-        return None
+        preview_image = self._walk_item(item_path)['preview_image']
+        if preview_image:
+            logger.debug(f"Found preview image: {preview_image}")
+        return preview_image
     
     def get_directory_size(self, path: str) -> int:
         """Get total size of directory in bytes"""
-        total_size = 0
-        try:
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total_size += os.path.getsize(filepath)
-        except Exception as e:
-            logger.debug(f"Could not calculate directory size: {e}")
-        return total_size
+        return self._walk_item(path)['size']
     
     def format_size(self, size_bytes: int) -> str:
         """Format size in human readable format"""
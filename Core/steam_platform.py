@@ -0,0 +1,103 @@
+import os
+import sys
+import logging
+from typing import List
+
+from Core.vdf import load_vdf
+
+logger = logging.getLogger("SteamPlatform")
+
+
+def _windows_roots() -> List[str]:
+    roots = []
+    try:
+        import winreg
+    except ImportError:
+        return roots
+
+    registry_keys = [
+        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam", "InstallPath"),
+        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Valve\Steam", "InstallPath"),
+        (winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam", "SteamPath"),
+    ]
+    for hive, key_path, value in registry_keys:
+        try:
+            with winreg.OpenKey(hive, key_path) as key:
+                roots.append(os.path.normpath(winreg.QueryValueEx(key, value)[0]))
+        except (FileNotFoundError, OSError):
+            pass
+
+    # Try common installation paths
+    for path in [r"C:\Program Files (x86)\Steam", r"C:\Program Files\Steam", r"D:\Steam", r"E:\Steam"]:
+        if os.path.exists(os.path.join(path, "steam.exe")):
+            roots.append(path)
+    return roots
+
+
+def _linux_roots() -> List[str]:
+    home = os.path.expanduser("~")
+    return [
+        os.path.join(home, ".steam", "steam"),
+        os.path.join(home, ".steam", "root"),
+        os.path.join(home, ".local", "share", "Steam"),
+        # Flatpak and Snap packaged Steam
+        os.path.join(home, ".var", "app", "com.valvesoftware.Steam", ".local", "share", "Steam"),
+        os.path.join(home, "snap", "steam", "common", ".local", "share", "Steam"),
+    ]
+
+
+def _mac_roots() -> List[str]:
+    return [os.path.join(os.path.expanduser("~"), "Library", "Application Support", "Steam")]
+
+
+def find_steam_roots() -> List[str]:
+    """Existing Steam installation folders for this platform, most likely first
+
+    On Linux the game runs through Proton, but workshop content is still stored
+    in the native Steam library, so the same folder layout applies everywhere.
+    """
+    if sys.platform == "win32":
+        candidates = _windows_roots()
+    elif sys.platform == "darwin":
+        candidates = _mac_roots()
+    else:
+        candidates = _linux_roots()
+
+    roots = []
+    seen = set()
+    for path in candidates:
+        # ~/.steam/steam is usually a symlink to ~/.local/share/Steam
+        real = os.path.realpath(path)
+        if real in seen or not os.path.isdir(os.path.join(real, "steamapps")):
+            continue
+        seen.add(real)
+        roots.append(real)
+    return roots
+
+
+def library_folders(steam_path: str) -> List[str]:
+    """``steamapps`` folders of every Steam library listed in libraryfolders.vdf"""
+    libs = []
+    for vdf in [os.path.join(steam_path, "steamapps", "libraryfolders.vdf"),
+                os.path.join(steam_path, "config", "libraryfolders.vdf")]:
+        if not os.path.exists(vdf):
+            continue
+        try:
+            folders = load_vdf(vdf)
+        except Exception as e:
+            logger.debug(f"Could not read {vdf}: {e}")
+            continue
+        folders = folders.get("libraryfolders") or folders.get("LibraryFolders") or {}
+        for key, value in folders.items():
+            # current format: "0" { "path" "..." }, old format: "1" "D:\\SteamLibrary"
+            if isinstance(value, dict):
+                path = value.get("path")
+            elif key.isdigit():
+                path = value
+            else:
+                continue
+            if path:
+                steamapps = os.path.join(path, "steamapps")
+                if os.path.isdir(steamapps) and steamapps not in libs:
+                    libs.append(steamapps)
+    return libs
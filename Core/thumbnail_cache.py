@@ -0,0 +1,83 @@
+import os
+import logging
+import threading
+from typing import Optional, Tuple
+
+from Core.utils import hashed_filename
+
+logger = logging.getLogger("ThumbnailCache")
+
+
+class ThumbnailCache:
+    """Directory of downscaled preview images with size-bounded LRU eviction.
+
+    A thumbnail is keyed by the source path, size and mtime plus the thumbnail
+    size, so an edited or replaced preview image simply misses the cache. The
+    file mtime of a thumbnail doubles as its last-use time for eviction.
+    """
+
+    def __init__(self, cache_dir: str = "thumbnails", max_bytes: int = 64 * 1024 * 1024,
+                 thumb_size: Tuple[int, int] = (100, 100)):
+        self.cache_dir = os.path.join(os.getcwd(), cache_dir)
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._entries())
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".png"):
+                    st = entry.stat()
+                    yield entry.path, st.st_mtime, st.st_size
+
+    def cache_path(self, source: str) -> Optional[str]:
+        """Path of the thumbnail for ``source``, None if the source is unreadable"""
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        w, h = self.thumb_size
+        key = hashed_filename(f"{os.path.abspath(source)}|{st.st_size}|{st.st_mtime_ns}|{w}x{h}")
+        return os.path.join(self.cache_dir, key + ".png")
+
+    def lookup(self, source: str) -> Optional[str]:
+        """Return the cached thumbnail of ``source`` and mark it recently used"""
+        path = self.cache_path(source)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def commit(self, path: str):
+        """Account for a thumbnail just written to ``path`` and evict if over budget"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self.lock:
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Drop least recently used thumbnails until the cache is at 80% of its budget"""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.8
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        logger.debug(f"Thumbnail cache evicted down to {total} bytes")
+        self.total_bytes = total
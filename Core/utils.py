@@ -1,4 +1,5 @@
 from hashlib import md5
+import codecs
 import os
 import re
 import json
@@ -11,8 +12,13 @@ def hashed_filename(s: str) -> str:
     return t.hexdigest()
 
 def normalize(s: str) -> str:
+    """Make a title or character name from an untrusted config safe as a single folder name"""
     s = ''.join(c for c in s if ord(c) >= 32 or c == ' ')
     s = re.sub(r'[<>:"|?*]', '', s)
+    # no separators, so the name can't leave or nest below the output folder
+    s = re.sub(r'[/\\]', '_', s).replace(os.sep, '_')
+    # Windows drops trailing dots and spaces; this also rules out "." and ".."
+    s = s.rstrip('. ')
     if not s.strip():
         s = "unnamed"
     return s
@@ -121,4 +127,23 @@ def guess_type(data: bytes):
         json.loads(data.decode("utf8"))
         return ".json"
     except:
-        return ""
\ No newline at end of file
+        return ""
+
+# filetype never looks past the first 8 KB of a payload
+SNIFF_SIZE = 8192
+
+def sniff_type(prefix: bytes, complete: bool) -> str:
+    """guess_type from the first SNIFF_SIZE bytes, ``complete`` if that is the whole payload"""
+    if complete:
+        return guess_type(prefix)
+    ftype = filetype.guess(prefix)
+    if ftype != None:
+        return "." + ftype.extension
+    try:
+        # incremental decoding tolerates a character cut off at the end
+        text = codecs.getincrementaldecoder("utf8")().decode(prefix)
+    except UnicodeDecodeError:
+        return ""
+    if text.lstrip("\ufeff \t\r\n").startswith(("{", "[")):
+        return ".json"
+    return ""
@@ -0,0 +1,48 @@
+import re
+from typing import Dict
+
+# quoted string | brace | bare token; // comments and [$PLATFORM] conditionals are skipped
+_token_rule = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*|\[[^\]\n]*\]|([^\s{}"]+)')
+_escapes = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def _unescape(s: str) -> str:
+    if "\\" not in s:
+        return s
+    return re.sub(r"\\(.)", lambda m: _escapes.get(m.group(1), m.group(0)), s)
+
+
+def parse_vdf(text: str) -> Dict:
+    """Parse Valve's KeyValues text format (.vdf/.acf) into nested dicts.
+
+    Duplicate keys keep the last value; a missing closing brace ends the
+    current section instead of raising, since Steam files are sometimes
+    truncated while Steam is writing them.
+    """
+    root: Dict = {}
+    stack = [root]
+    key = None
+    for m in _token_rule.finditer(text):
+        quoted, brace, bare = m.groups()
+        if brace == "{":
+            section: Dict = {}
+            stack[-1][key if key is not None else ""] = section
+            stack.append(section)
+            key = None
+        elif brace == "}":
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        elif quoted is not None or bare is not None:
+            token = _unescape(quoted) if quoted is not None else bare
+            if key is None:
+                key = token
+            else:
+                stack[-1][key] = token
+                key = None
+    return root
+
+
+def load_vdf(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return parse_vdf(f.read())
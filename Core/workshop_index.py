@@ -0,0 +1,67 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+UNKNOWN_TYPE = "Unknown"
+
+# sort name -> (key function, descending)
+SORT_ORDERS: Dict[str, Tuple[Callable[[Dict], object], bool]] = {
+    "title": (lambda item: item['title'].lower(), False),
+    "size_desc": (lambda item: item['size'], True),
+    "size_asc": (lambda item: item['size'], False),
+    "updated": (lambda item: item.get('time_updated', 0), True),
+    "item_id": (lambda item: (len(item['item_id']), item['item_id']), False),
+}
+
+
+class WorkshopIndex:
+    """In-memory search index over scanned workshop items.
+
+    Every item gets one lowercased haystack of its title, item id, character
+    names and LPK type; a query keeps the items containing all of its tokens.
+    Sort orders are computed once per build and reused by every query, so a
+    query over 10k items is a few list comprehensions.
+    """
+
+    def __init__(self, items: List[Dict] = None):
+        self.build(items or [])
+
+    def build(self, items: List[Dict]):
+        self.items = list(items)
+        self.haystacks = [
+            " ".join([item['title'], item['item_id'], self.item_type(item)] + list(item.get('characters') or [])).lower()
+            for item in self.items
+        ]
+        self.orders: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def item_type(item: Dict) -> str:
+        return item.get('lpk_type') or UNKNOWN_TYPE
+
+    def types(self) -> List[str]:
+        return sorted({self.item_type(item) for item in self.items})
+
+    def order(self, sort: str) -> List[int]:
+        if sort not in self.orders:
+            key, reverse = SORT_ORDERS[sort]
+            self.orders[sort] = sorted(range(len(self.items)), key=lambda i: key(self.items[i]), reverse=reverse)
+        return self.orders[sort]
+
+    def query(self, text: str = "", lpk_type: Optional[str] = None,
+              min_size: Optional[int] = None, max_size: Optional[int] = None,
+              sort: Optional[str] = None) -> List[int]:
+        """Return positions of matching items, in ``sort`` order or index order"""
+        rows = range(len(self.items))
+        for token in text.lower().split():
+            rows = [i for i in rows if token in self.haystacks[i]]
+        if lpk_type is not None:
+            rows = [i for i in rows if self.item_type(self.items[i]) == lpk_type]
+        if min_size is not None:
+            rows = [i for i in rows if self.items[i]['size'] >= min_size]
+        if max_size is not None:
+            rows = [i for i in rows if self.items[i]['size'] < max_size]
+
+        if sort:
+            matched = set(rows)
+            if len(matched) == len(self.items):
+                return list(self.order(sort))
+            return [i for i in self.order(sort) if i in matched]
+        return list(rows)
@@ -9,6 +9,7 @@ from qfluentwidgets import (SubtitleLabel, BodyLabel, PushButton, Slider, CheckB
                            CardWidget, SingleDirectionScrollArea, TextBrowser, ColorDialog)
 
 from GUI.Live2DPreviewWindow import Live2DPreviewWindow
+from Core.model_discovery import find_model_json
 # Try to import motion fixer utilities
 import motion_fixed
 
@@ -166,7 +167,8 @@ class DragDropArea(QFrame):
             urls = event.mimeData().urls()
             if urls and len(urls) == 1:
                 file_path = urls[0].toLocalFile()
-                if _is_model_json(file_path):
+                # 模型文件或模型文件夹
+                if _is_model_json(file_path) or os.path.isdir(file_path):
                     event.acceptProposedAction()
                     self.setStyleSheet("""
                         DragDropArea {
@@ -201,7 +203,7 @@ class DragDropArea(QFrame):
         urls = event.mimeData().urls()
         if urls and len(urls) == 1:
             file_path = urls[0].toLocalFile()
-            if _is_model_json(file_path) and os.path.exists(file_path):
+            if (_is_model_json(file_path) and os.path.exists(file_path)) or os.path.isdir(file_path):
                 self.fileDropped.emit(file_path)
                 event.acceptProposedAction()
 
@@ -821,9 +823,16 @@ class PreviewPage(QFrame):
             self.show_error("File not found", f"The file {file_path} does not exist.")
             return
 
+        # 文件夹：查找其中的模型JSON文件
+        if os.path.isdir(file_path):
+            model_json = find_model_json(file_path)
+            if model_json is None:
+                self.show_error("No model found",
+                               f"{file_path} contains no Live2D model json.")
+                return
+            file_path = model_json
         # 检查文件扩展名，支持*model*.json文件
-        file_ext = file_path.lower()
-        if not _is_model_json(file_ext):
+        elif not _is_model_json(file_path.lower()):
             self.show_error("Invalid file type",
                            "Please select a *model*.json Live2D model file.")
             return
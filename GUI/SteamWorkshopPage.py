@@ -1,20 +1,27 @@
 import os
 import logging
-from typing import List, Dict
-from PyQt5.QtCore import pyqtSignal, QThread, Qt, QTimer
+from typing import List, Dict, Optional
+from PyQt5.QtCore import (
+    pyqtSignal, QThread, Qt, QTimer, QObject, QRunnable, QThreadPool, QSize,
+    QAbstractListModel, QAbstractProxyModel, QModelIndex, QFileSystemWatcher
+)
 from PyQt5.QtWidgets import (
     QWidget, QFrame, QVBoxLayout, QHBoxLayout, QGridLayout, 
     QFileDialog, QApplication, QSizePolicy, QHeaderView, QAbstractItemView,
-    QLabel
+    QLabel, QListView, QStyledItemDelegate
 )
-from PyQt5.QtGui import QFont, QPixmap
+from PyQt5.QtGui import QFont, QPixmap, QImage, QImageReader, QPixmapCache, QPainter, QColor
 from qfluentwidgets import (
     PushButton, LineEdit, ComboBox, ProgressBar, TextEdit, SubtitleLabel,
-    FluentIcon, InfoBar, InfoBarPosition, MessageBox, TableWidget,
-    CheckBox, ToolButton, CardWidget, BodyLabel, CaptionLabel
+    FluentIcon, InfoBar, InfoBarPosition, MessageBox, TableWidget, SearchLineEdit,
+    CheckBox, ToolButton, BodyLabel, CaptionLabel
 )
 
 from Core.steam_integration import SteamIntegration
+from Core.batch_extractor import BatchExtractor
+from Core.scan_cache import WorkshopScanCache
+from Core.thumbnail_cache import ThumbnailCache
+from Core.workshop_index import WorkshopIndex, UNKNOWN_TYPE
 from Core.settings_manager import SettingsManager
 
 # Logger class for GUI output
@@ -34,29 +41,126 @@ class QTextEditLogger(logging.Handler):
 
 # Thread for Steam scanning
 class SteamScanThread(QThread):
+    itemFound = pyqtSignal(dict)
     scanFinished = pyqtSignal(list)
     scanError = pyqtSignal(str)
     
     def __init__(self, steam_path=None):
         super().__init__()
         self.steam_path = steam_path
+        self.workshop_path = None
+        self.snapshot = {}
         
     def run(self):
         try:
             steam_integration = SteamIntegration()
+            cache = WorkshopScanCache()
             if self.steam_path:
-                workshop_items = steam_integration.scan_workshop_items(
-                    steam_integration.get_workshop_path(self.steam_path)
-                )
+                self.workshop_path = steam_integration.get_workshop_path(self.steam_path)
             else:
-                workshop_items = steam_integration.scan_workshop_items()
+                self.workshop_path = steam_integration.get_workshop_path()
+            # Taken before scanning so that changes made during the scan are picked up later
+            self.snapshot = steam_integration.snapshot_workshop(self.workshop_path) if self.workshop_path else {}
+            workshop_items = steam_integration.scan_workshop_items(
+                self.workshop_path, on_item=self.itemFound.emit, cache=cache
+            )
             self.scanFinished.emit(workshop_items)
         except Exception as e:
             self.scanError.emit(str(e))
 
+# Thread for incremental workshop updates
+class WorkshopUpdateThread(QThread):
+    # every signal carries the scan generation the update was started for
+    itemUpdated = pyqtSignal(int, dict)
+    itemRemoved = pyqtSignal(int, str)
+    updateFinished = pyqtSignal(int, dict)
+    
+    def __init__(self, workshop_path: str, snapshot: Dict[str, int], generation: int):
+        super().__init__()
+        self.workshop_path = workshop_path
+        self.snapshot = snapshot
+        self.generation = generation
+        
+    def run(self):
+        # on failure the old snapshot is kept, so the next update retries the same changes
+        new_snapshot = self.snapshot
+        try:
+            new_snapshot = self.apply_changes()
+        except Exception as e:
+            logging.getLogger("SteamWorkshopPage").warning(f"Workshop update failed: {e}")
+        finally:
+            self.updateFinished.emit(self.generation, new_snapshot)
+    
+    def apply_changes(self) -> Dict[str, int]:
+        steam_integration = SteamIntegration()
+        new_snapshot = steam_integration.snapshot_workshop(self.workshop_path)
+        added, modified, removed = SteamIntegration.diff_snapshots(self.snapshot, new_snapshot)
+        
+        if added or modified or removed:
+            logging.getLogger("SteamWorkshopPage").info(
+                f"Workshop changed: {len(added)} added, {len(modified)} updated, {len(removed)} removed"
+            )
+            cache = WorkshopScanCache()
+            steam_integration.workshop_manifest = steam_integration.load_workshop_manifest(self.workshop_path)
+            for item_id in added + modified:
+                item_path = os.path.join(self.workshop_path, item_id)
+                try:
+                    item = steam_integration.scan_item_cached(item_id, item_path, cache)
+                except Exception as e:
+                    logging.debug(f"Failed to rescan {item_path}: {e}")
+                    continue
+                if item:
+                    self.itemUpdated.emit(self.generation, item)
+                else:
+                    self.itemRemoved.emit(self.generation, item_id)
+            for item_id in removed:
+                self.itemRemoved.emit(self.generation, item_id)
+            cache.prune(os.path.join(self.workshop_path, item_id) for item_id in new_snapshot)
+            cache.save()
+        
+        return new_snapshot
+
+class WorkshopWatcher(QObject):
+    """Watches the workshop content directory and signals debounced changes
+
+    QFileSystemWatcher reports item directories being added, replaced or
+    removed; a slow poll covers file systems where notifications are missed.
+    A burst of writes while Steam downloads restarts the debounce timer, so it
+    results in a single ``changed`` signal.
+    """
+    changed = pyqtSignal()
+    
+    def __init__(self, parent=None, debounce_ms: int = 2000, poll_ms: int = 60000):
+        super().__init__(parent)
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(self.schedule)
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.changed)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_ms)
+        self.poll_timer.timeout.connect(self.schedule)
+        
+    def watch(self, path: str):
+        self.stop()
+        if path and os.path.isdir(path):
+            self.fs_watcher.addPath(path)
+            self.poll_timer.start()
+    
+    def stop(self):
+        if self.fs_watcher.directories():
+            self.fs_watcher.removePaths(self.fs_watcher.directories())
+        self.poll_timer.stop()
+        self.debounce_timer.stop()
+    
+    def schedule(self, *args):
+        self.debounce_timer.start()
+
 # Thread for batch extraction
 class BatchExtractionThread(QThread):
     progressUpdated = pyqtSignal(int, str)
+    itemFinished = pyqtSignal(dict)
     extractionFinished = pyqtSignal()
     extractionError = pyqtSignal(str)
     
@@ -64,173 +168,387 @@ class BatchExtractionThread(QThread):
         super().__init__()
         self.selected_items = selected_items
         self.output_base_dir = output_base_dir
+        self.extractor = BatchExtractor(output_base_dir, decrypt_cache_file="decrypt_cache.db")
         
     def run(self):
         try:
-            from Core.lpk_loader import LpkLoader
-            total_items = len(self.selected_items)
-            
-            for i, item in enumerate(self.selected_items):
-                self.progressUpdated.emit(
-                    int((i / total_items) * 100), 
-                    f"Processing {item['title']}..."
-                )
-                
-                # Create output directory for this item
-                item_output_dir = os.path.join(self.output_base_dir, item['title'])
-                os.makedirs(item_output_dir, exist_ok=True)
-                
-                # Process each LPK file in the item
-                for lpk_file in item['lpk_files']:
-                    config_file = item['config_files'][0] if item['config_files'] else None
-                    
-                    try:
-                        loader = LpkLoader(lpk_file, config_file)
-                        loader.extract(item_output_dir)
-                    except Exception as e:
-                        logging.error(f"Failed to extract {lpk_file}: {e}")
-                        continue
-            
+            self.progressUpdated.emit(0, f"Extracting {len(self.selected_items)} items...")
+            self.extractor.run(self.selected_items, self.on_item_finished)
             self.progressUpdated.emit(100, "Extraction completed!")
             self.extractionFinished.emit()
             
         except Exception as e:
             self.extractionError.emit(str(e))
+    
+    def on_item_finished(self, result: Dict, done: int, total: int, throughput: float):
+        self.itemFinished.emit(result)
+        self.progressUpdated.emit(
+            int((done / total) * 100),
+            f"Extracted {done}/{total} items ({throughput / (1024 * 1024):.1f} MB/s)"
+        )
+
+THUMBNAIL_SIZE = QSize(100, 100)
+ITEM_HEIGHT = 130
+
+LPK_TYPE_FILTERS = ["STM_1_0", "STD2_0", "STD_1_0", UNKNOWN_TYPE]
+# label, min size, max size
+SIZE_FILTERS = [
+    ("Any Size", None, None),
+    ("< 10 MB", None, 10 * 1024 * 1024),
+    ("10 - 100 MB", 10 * 1024 * 1024, 100 * 1024 * 1024),
+    ("> 100 MB", 100 * 1024 * 1024, None),
+]
+# label, WorkshopIndex sort order
+SORT_CHOICES = [
+    ("Default Order", None),
+    ("Title", "title"),
+    ("Largest First", "size_desc"),
+    ("Smallest First", "size_asc"),
+    ("Recently Updated", "updated"),
+    ("Item ID", "item_id"),
+]
 
-class WorkshopItemCard(CardWidget):
-    """Custom card widget for workshop items"""
+
+def format_size(size_bytes: int) -> str:
+    """Format size in human readable format"""
+    if size_bytes == 0:
+        return "0 B"
     
-    def __init__(self, item_data: Dict, parent=None):
-        super().__init__(parent)
-        self.item_data = item_data
-        self.selected = False
-        self.setupUI()
+    size_names = ["B", "KB", "MB", "GB"]
+    i = 0
+    while size_bytes >= 1024 and i < len(size_names) - 1:
+        size_bytes /= 1024.0
+        i += 1
+    
+    return f"{size_bytes:.1f} {size_names[i]}"
+
+
+class ThumbnailTask(QRunnable):
+    """Decode a preview image at thumbnail size in a pool thread"""
+    
+    def __init__(self, loader, path: str):
+        super().__init__()
+        self.loader = loader
+        self.path = path
         
-    def setupUI(self):
-        self.setFixedHeight(140)  # Increased height to accommodate preview image
-        layout = QHBoxLayout(self)  # Changed to horizontal layout
-        layout.setContentsMargins(15, 10, 15, 10)
-        
-        # Preview image section
-        self.preview_label = QLabel()
-        self.preview_label.setFixedSize(100, 100)
-        self.preview_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #E0E0E0;
-                border-radius: 8px;
-                background-color: #F5F5F5;
-            }
-        """)
-        self.preview_label.setAlignment(Qt.AlignCenter)
-        self.preview_label.setScaledContents(True)
-        
-        # Load preview image if available
-        self.load_preview_image()
-        
-        layout.addWidget(self.preview_label)
-        
-        # Content section
-        content_layout = QVBoxLayout()
-        content_layout.setSpacing(8)
-        
-        # Header with checkbox and title
-        header_layout = QHBoxLayout()
-        self.checkbox = CheckBox()
-        self.checkbox.stateChanged.connect(self.on_selection_changed)
-        
-        self.title_label = SubtitleLabel(self.item_data['title'])
-        self.title_label.setWordWrap(True)
-        
-        header_layout.addWidget(self.checkbox)
-        header_layout.addWidget(self.title_label, 1)
-        
-        # Info layout
-        info_layout = QGridLayout()
-        info_layout.setSpacing(5)
-        
-        # Item ID
-        info_layout.addWidget(BodyLabel("Item ID:"), 0, 0)
-        info_layout.addWidget(CaptionLabel(self.item_data['item_id']), 0, 1)
-        
-        # LPK files count
-        lpk_count = len(self.item_data['lpk_files'])
-        info_layout.addWidget(BodyLabel("LPK Files:"), 1, 0)
-        info_layout.addWidget(CaptionLabel(str(lpk_count)), 1, 1)
-        
-        # Size
-        size_text = self.format_size(self.item_data['size'])
-        info_layout.addWidget(BodyLabel("Size:"), 0, 2)
-        info_layout.addWidget(CaptionLabel(size_text), 0, 3)
-        
-        # Config files
-        config_count = len(self.item_data['config_files'])
-        info_layout.addWidget(BodyLabel("Config Files:"), 1, 2)
-        info_layout.addWidget(CaptionLabel(str(config_count)), 1, 3)
-        
-        content_layout.addLayout(header_layout)
-        content_layout.addLayout(info_layout)
-        
-        layout.addLayout(content_layout, 1)  # Give content more space
-        
-    def load_preview_image(self):
-        """Load and display preview image"""
-        preview_path = self.item_data.get('preview_image')
-        
-        if preview_path and os.path.exists(preview_path):
-            try:
-                pixmap = QPixmap(preview_path)
-                if not pixmap.isNull():
-                    # Scale the image to fit the label while maintaining aspect ratio
-                    scaled_pixmap = pixmap.scaled(
-                        self.preview_label.size(), 
-                        Qt.KeepAspectRatio, 
-                        Qt.SmoothTransformation
-                    )
-                    self.preview_label.setPixmap(scaled_pixmap)
-                else:
-                    self.set_no_preview_text()
-            except Exception as e:
-                logging.debug(f"Failed to load preview image {preview_path}: {e}")
-                self.set_no_preview_text()
+    def run(self):
+        cache = self.loader.cache
+        cached = cache.lookup(self.path) if cache else None
+        if cached:
+            image = QImage(cached)
+            if not image.isNull():
+                self.loader.thumbnailReady.emit(self.path, image)
+                return
+        
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid():
+            # Let the decoder downscale instead of decoding the full image
+            reader.setScaledSize(size.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio))
+        image = reader.read()
+        if cache and not image.isNull():
+            self.store(cache, image)
+        self.loader.thumbnailReady.emit(self.path, image)
+    
+    def store(self, cache: ThumbnailCache, image: QImage):
+        target = cache.cache_path(self.path)
+        if target is None:
+            return
+        tmp = target + ".tmp"
+        try:
+            if image.save(tmp, "PNG"):
+                os.replace(tmp, target)
+                cache.commit(target)
+        except OSError as e:
+            logging.debug(f"Failed to cache thumbnail of {self.path}: {e}")
+
+
+class ThumbnailLoader(QObject):
+    """Loads preview thumbnails off the GUI thread, most recent requests first"""
+    thumbnailReady = pyqtSignal(str, QImage)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(4)
+        try:
+            self.cache = ThumbnailCache(thumb_size=(THUMBNAIL_SIZE.width(), THUMBNAIL_SIZE.height()))
+        except OSError as e:
+            logging.debug(f"Thumbnail cache unavailable: {e}")
+            self.cache = None
+        self.pending = set()
+        self.priority = 0
+        self.thumbnailReady.connect(self._on_ready)
+        
+    def request(self, path: str):
+        if path in self.pending:
+            return
+        self.pending.add(path)
+        # Rows scrolled into view last are the ones on screen now
+        self.priority += 1
+        self.pool.start(ThumbnailTask(self, path), self.priority)
+    
+    def _on_ready(self, path: str, image: QImage):
+        self.pending.discard(path)
+
+
+def _placeholder_pixmap(text: str) -> QPixmap:
+    pixmap = QPixmap(THUMBNAIL_SIZE)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(QColor("#E0E0E0"))
+    painter.setBrush(QColor("#F5F5F5"))
+    painter.drawRoundedRect(pixmap.rect().adjusted(1, 1, -1, -1), 8, 8)
+    painter.setPen(QColor("#888888"))
+    font = painter.font()
+    font.setPixelSize(12)
+    painter.setFont(font)
+    painter.drawText(pixmap.rect(), Qt.AlignCenter, text)
+    painter.end()
+    return pixmap
+
+
+class WorkshopItemModel(QAbstractListModel):
+    """List model over scanned workshop items with a checkbox per item"""
+    ItemRole = Qt.UserRole + 1
+    checkedChanged = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Thumbnails are small; keep a few thousand of them around
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), 64 * 1024))
+        self.items: List[Dict] = []
+        self.checked = set()
+        self.rows_by_preview: Dict[str, List[int]] = {}
+        self.failed_previews = set()
+        self.loading_pixmap = _placeholder_pixmap("Loading...")
+        self.no_preview_pixmap = _placeholder_pixmap("No Preview\nAvailable")
+        self.thumbnail_loader = ThumbnailLoader(self)
+        self.thumbnail_loader.thumbnailReady.connect(self.on_thumbnail_ready)
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+    
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.items[index.row()]
+        if role == Qt.DisplayRole:
+            characters = ", ".join(item.get('characters') or []) or "-"
+            return (
+                f"{item['title']}\n"
+                f"Item ID: {item['item_id']}    Size: {format_size(item['size'])}\n"
+                f"LPK Files: {len(item['lpk_files'])}    Config Files: {len(item['config_files'])}\n"
+                f"Type: {item.get('lpk_type') or 'Unknown'}    Characters: {characters}"
+            )
+        if role == Qt.DecorationRole:
+            return self.thumbnail(item.get('preview_image'))
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if item['item_id'] in self.checked else Qt.Unchecked
+        if role == Qt.ToolTipRole:
+            return item.get('description') or None
+        if role == self.ItemRole:
+            return item
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        item_id = self.items[index.row()]['item_id']
+        if value == Qt.Checked:
+            self.checked.add(item_id)
+        else:
+            self.checked.discard(item_id)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.checkedChanged.emit()
+        return True
+    
+    def thumbnail(self, path: str) -> QPixmap:
+        """Cached thumbnail for ``path``, or a placeholder while it is being decoded"""
+        if not path or path in self.failed_previews:
+            return self.no_preview_pixmap
+        pixmap = QPixmapCache.find(path)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        self.thumbnail_loader.request(path)
+        return self.loading_pixmap
+    
+    def on_thumbnail_ready(self, path: str, image: QImage):
+        if image.isNull():
+            logging.debug(f"Failed to load preview image {path}")
+            self.failed_previews.add(path)
+        else:
+            QPixmapCache.insert(path, QPixmap.fromImage(image))
+        for row in self.rows_by_preview.get(path, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+    
+    def clear(self):
+        self.beginResetModel()
+        self.items = []
+        self.checked.clear()
+        self.rows_by_preview.clear()
+        self.endResetModel()
+    
+    def append_item(self, item: Dict):
+        row = len(self.items)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.items.append(item)
+        if item.get('preview_image'):
+            self.rows_by_preview.setdefault(item['preview_image'], []).append(row)
+        self.endInsertRows()
+    
+    def row_of(self, item_id: str) -> int:
+        return next((row for row, item in enumerate(self.items) if item['item_id'] == item_id), -1)
+    
+    def upsert_item(self, item: Dict):
+        """Replace the item with the same id in place, or append it"""
+        row = self.row_of(item['item_id'])
+        if row < 0:
+            self.append_item(item)
+            return
+        old_preview = self.items[row].get('preview_image')
+        self.items[row] = item
+        if old_preview != item.get('preview_image'):
+            self._reindex_previews()
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+    
+    def remove_item(self, item_id: str):
+        row = self.row_of(item_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.items[row]
+        self._reindex_previews()
+        self.endRemoveRows()
+        if item_id in self.checked:
+            self.checked.discard(item_id)
+            self.checkedChanged.emit()
+    
+    def _reindex_previews(self):
+        self.rows_by_preview.clear()
+        for row, item in enumerate(self.items):
+            if item.get('preview_image'):
+                self.rows_by_preview.setdefault(item['preview_image'], []).append(row)
+    
+    def set_checked(self, rows: List[int], checked: bool):
+        """Check or uncheck the items at ``rows``"""
+        item_ids = {self.items[row]['item_id'] for row in rows}
+        if checked:
+            self.checked |= item_ids
         else:
-            self.set_no_preview_text()
-    
-    def set_no_preview_text(self):
-        """Set text when no preview image is available"""
-        self.preview_label.setText("No Preview\nAvailable")
-        self.preview_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #E0E0E0;
-                border-radius: 8px;
-                background-color: #F5F5F5;
-                color: #888888;
-                font-size: 12px;
-            }
-        """)
-        
-    def format_size(self, size_bytes: int) -> str:
-        """Format size in human readable format"""
-        if size_bytes == 0:
-            return "0 B"
-        
-        size_names = ["B", "KB", "MB", "GB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        
-        return f"{size_bytes:.1f} {size_names[i]}"
-    
-    def on_selection_changed(self, state):
-        self.selected = state == Qt.Checked
-        if hasattr(self.parent(), 'update_selection_count'):
-            self.parent().update_selection_count()
-    
-    def is_selected(self) -> bool:
-        return self.checkbox.isChecked()
-    
-    def set_selected(self, selected: bool):
-        self.checkbox.setChecked(selected)
+            self.checked -= item_ids
+        if self.items:
+            self.dataChanged.emit(self.index(0), self.index(len(self.items) - 1), [Qt.CheckStateRole])
+        self.checkedChanged.emit()
+    
+    def checked_items(self) -> List[Dict]:
+        return [item for item in self.items if item['item_id'] in self.checked]
+
+
+class WorkshopFilterProxy(QAbstractProxyModel):
+    """Shows the rows of WorkshopItemModel picked by a WorkshopIndex query, in query order
+
+    The row mapping is an explicit list, so applying a query is a model reset of
+    the view (which only paints visible rows) and never calls back into Python
+    per comparison the way QSortFilterProxyModel sorting would.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: List[int] = []
+        self.positions: Dict[int, int] = {}
+        self.filtered = False
+        
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.dataChanged.connect(self._on_source_data_changed)
+        model.rowsInserted.connect(self._on_source_rows_inserted)
+        model.rowsRemoved.connect(self._on_source_rows_removed)
+        model.modelReset.connect(self.clear_rows)
+        self.clear_rows()
+    
+    def set_rows(self, rows: Optional[List[int]]):
+        """Show ``rows`` of the source model; None shows all of them in source order"""
+        self.beginResetModel()
+        self.filtered = rows is not None
+        self.rows = list(rows) if rows is not None else list(range(self.sourceModel().rowCount()))
+        self.positions = {row: i for i, row in enumerate(self.rows)}
+        self.endResetModel()
+    
+    def clear_rows(self):
+        self.set_rows(None)
+    
+    def source_rows(self) -> List[int]:
+        return list(self.rows)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+    
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.rows) or column != 0:
+            return QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index=None):
+        return QModelIndex()
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.rows[proxy_index.row()])
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid() or source_index.row() not in self.positions:
+            return QModelIndex()
+        return self.index(self.positions[source_index.row()])
+    
+    def _on_source_data_changed(self, top_left, bottom_right, roles=[]):
+        if top_left.row() != bottom_right.row():
+            if self.rows:
+                self.dataChanged.emit(self.index(0), self.index(len(self.rows) - 1), roles)
+            return
+        index = self.mapFromSource(top_left)
+        if index.isValid():
+            self.dataChanged.emit(index, index, roles)
+    
+    def _on_source_rows_inserted(self, parent, first, last):
+        # New rows are shown right away unless a query is active; the page re-runs it
+        if self.filtered:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + last - first)
+        for row in range(first, last + 1):
+            self.positions[row] = len(self.rows)
+            self.rows.append(row)
+        self.endInsertRows()
+    
+    def _on_source_rows_removed(self, parent, first, last):
+        # Drop the removed rows and renumber the ones behind them
+        removed = last - first + 1
+        filtered = self.filtered
+        self.set_rows([row if row < first else row - removed for row in self.rows if not first <= row <= last])
+        self.filtered = filtered
+
+
+class WorkshopItemDelegate(QStyledItemDelegate):
+    """Paints workshop items as fixed-height rows with a thumbnail"""
+    
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.decorationSize = THUMBNAIL_SIZE
+        
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ITEM_HEIGHT)
 
 class SteamWorkshopPage(QFrame):
     def __init__(self, parent=None):
@@ -240,7 +558,22 @@ class SteamWorkshopPage(QFrame):
         self.steam_integration = SteamIntegration()
         self.settings_manager = SettingsManager()
         self.workshop_items = []
-        self.item_cards = []
+        self.workshop_path = None
+        self.workshop_snapshot = {}
+        self.update_thread = None
+        self.update_pending = False
+        # bumped by every full scan, updates started for an older scan are discarded
+        self.scan_generation = 0
+        
+        self.search_index = WorkshopIndex()
+        self.index_dirty = False
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.apply_search)
+        
+        self.watcher = WorkshopWatcher(self)
+        self.watcher.changed.connect(self.update_workshop_items)
         
         self.setupUI()
         self.configure_logging()
@@ -300,20 +633,54 @@ class SteamWorkshopPage(QFrame):
         
         self.main_layout.addLayout(control_layout)
         
+        # Search, filter and sort
+        filter_layout = QHBoxLayout()
+        self.search_edit = SearchLineEdit(self)
+        self.search_edit.setPlaceholderText("Search by title, item ID, character or type...")
+        self.search_edit.textChanged.connect(self.schedule_search)
+        
+        self.type_combo = ComboBox(self)
+        self.type_combo.addItems(["All Types"] + LPK_TYPE_FILTERS)
+        self.type_combo.currentIndexChanged.connect(self.schedule_search)
+        
+        self.size_combo = ComboBox(self)
+        self.size_combo.addItems([label for label, _, _ in SIZE_FILTERS])
+        self.size_combo.currentIndexChanged.connect(self.schedule_search)
+        
+        self.sort_combo = ComboBox(self)
+        self.sort_combo.addItems([label for label, _ in SORT_CHOICES])
+        self.sort_combo.currentIndexChanged.connect(self.schedule_search)
+        
+        filter_layout.addWidget(self.search_edit, 1)
+        filter_layout.addWidget(self.type_combo)
+        filter_layout.addWidget(self.size_combo)
+        filter_layout.addWidget(self.sort_combo)
+        
+        self.main_layout.addLayout(filter_layout)
+        
         # Status label
         self.status_label = CaptionLabel("Ready to scan Steam Workshop", self)
         self.main_layout.addWidget(self.status_label)
         
-        # Workshop items container (scrollable)
-        from qfluentwidgets import ScrollArea
-        self.scroll_area = ScrollArea(self)
-        self.scroll_widget = QWidget()
-        self.items_layout = QVBoxLayout(self.scroll_widget)
-        self.items_layout.setSpacing(10)
-        self.scroll_area.setWidget(self.scroll_widget)
-        self.scroll_area.setWidgetResizable(True)
-        
-        self.main_layout.addWidget(self.scroll_area, 1)
+        # Workshop items list, only visible rows are painted
+        self.item_model = WorkshopItemModel(self)
+        self.item_model.checkedChanged.connect(self.update_selection_count)
+        self.item_view = QListView(self)
+        self.item_proxy = WorkshopFilterProxy(self)
+        self.item_proxy.setSourceModel(self.item_model)
+        self.item_model.rowsInserted.connect(self.on_items_changed)
+        self.item_model.rowsRemoved.connect(self.on_items_changed)
+        self.item_model.modelReset.connect(self.on_items_changed)
+        self.item_model.dataChanged.connect(self.on_item_data_changed)
+        self.item_view.setModel(self.item_proxy)
+        self.item_view.setItemDelegate(WorkshopItemDelegate(self.item_view))
+        self.item_view.setUniformItemSizes(True)
+        self.item_view.setIconSize(THUMBNAIL_SIZE)
+        self.item_view.setSpacing(5)
+        self.item_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.item_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        
+        self.main_layout.addWidget(self.item_view, 1)
         
         # Progress bar
         self.progress_bar = ProgressBar(self)
@@ -397,16 +764,29 @@ class SteamWorkshopPage(QFrame):
         # Start scanning in background thread
         self.scan_btn.setEnabled(False)
         self.status_label.setText("Scanning Steam Workshop...")
+        self.watcher.stop()
+        self.scan_generation += 1
+        self.clear_workshop_items()
         
         self.scan_thread = SteamScanThread(steam_path)
+        self.scan_thread.itemFound.connect(self.on_item_found)
         self.scan_thread.scanFinished.connect(self.on_scan_finished)
         self.scan_thread.scanError.connect(self.on_scan_error)
         self.scan_thread.start()
     
+    def on_item_found(self, item: Dict):
+        """Show a workshop item as soon as the scanner finds it"""
+        self.add_workshop_item(item)
+        self.status_label.setText(f"Scanning Steam Workshop... {self.item_model.rowCount()} items found")
+    
     def on_scan_finished(self, workshop_items: List[Dict]):
         """Handle scan completion"""
         self.workshop_items = workshop_items
-        self.display_workshop_items()
+        
+        # Keep the list current from now on without full rescans
+        self.workshop_path = self.scan_thread.workshop_path
+        self.workshop_snapshot = self.scan_thread.snapshot
+        self.watcher.watch(self.workshop_path)
         
         self.scan_btn.setEnabled(True)
         self.status_label.setText(f"Found {len(workshop_items)} workshop items")
@@ -431,45 +811,115 @@ class SteamWorkshopPage(QFrame):
             parent=self
         )
     
+    def update_workshop_items(self):
+        """Apply workshop changes reported by the watcher to the list"""
+        if not self.workshop_path or not self.scan_btn.isEnabled():
+            return
+        if self.update_thread is not None and self.update_thread.isRunning():
+            self.update_pending = True
+            return
+        self.update_pending = False
+        self.update_thread = WorkshopUpdateThread(self.workshop_path, self.workshop_snapshot, self.scan_generation)
+        self.update_thread.itemUpdated.connect(self.on_item_updated)
+        self.update_thread.itemRemoved.connect(self.on_item_removed)
+        self.update_thread.updateFinished.connect(self.on_update_finished)
+        self.update_thread.start()
+    
+    def on_item_updated(self, generation: int, item: Dict):
+        if generation == self.scan_generation:
+            self.item_model.upsert_item(item)
+    
+    def on_item_removed(self, generation: int, item_id: str):
+        if generation == self.scan_generation:
+            self.item_model.remove_item(item_id)
+    
+    def on_update_finished(self, generation: int, snapshot: Dict):
+        """Remember the new workshop state and run any update queued meanwhile"""
+        if generation != self.scan_generation:
+            # a full rescan started meanwhile, its own snapshot replaces this one
+            if self.update_pending:
+                self.update_workshop_items()
+            return
+        self.workshop_snapshot = snapshot
+        self.workshop_items = list(self.item_model.items)
+        if self.workshop_items:
+            self.select_all_btn.setEnabled(True)
+            self.select_none_btn.setEnabled(True)
+            self.extract_selected_btn.setEnabled(True)
+        if self.update_pending:
+            self.update_workshop_items()
+    
+    def clear_workshop_items(self):
+        """Remove all workshop items from the list"""
+        self.item_model.clear()
+        self.workshop_items = []
+    
+    def add_workshop_item(self, item: Dict):
+        """Append a workshop item to the list"""
+        self.item_model.append_item(item)
+    
     def display_workshop_items(self):
         """Display workshop items in the UI"""
-        # Clear existing items
-        for card in self.item_cards:
-            card.setParent(None)
-        self.item_cards.clear()
-        
-        # Add new items
-        for item in self.workshop_items:
-            card = WorkshopItemCard(item, self.scroll_widget)
-            self.item_cards.append(card)
-            self.items_layout.addWidget(card)
-        
-        # Add stretch to push items to top
-        self.items_layout.addStretch()
+        workshop_items = self.workshop_items
+        self.clear_workshop_items()
+        for item in workshop_items:
+            self.add_workshop_item(item)
+        self.workshop_items = workshop_items
     
     def select_all_items(self):
-        """Select all workshop items"""
-        for card in self.item_cards:
-            card.set_selected(True)
-        self.update_selection_count()
+        """Select all workshop items shown by the current search"""
+        self.item_model.set_checked(self.item_proxy.source_rows(), True)
     
     def select_no_items(self):
-        """Deselect all workshop items"""
-        for card in self.item_cards:
-            card.set_selected(False)
-        self.update_selection_count()
+        """Deselect all workshop items shown by the current search"""
+        self.item_model.set_checked(self.item_proxy.source_rows(), False)
     
     def update_selection_count(self):
         """Update selection count in status"""
-        selected_count = sum(1 for card in self.item_cards if card.is_selected())
-        total_count = len(self.item_cards)
-        self.status_label.setText(f"Selected {selected_count} of {total_count} items")
+        selected_count = len(self.item_model.checked)
+        total_count = self.item_model.rowCount()
+        shown_count = self.item_proxy.rowCount()
+        if shown_count != total_count:
+            self.status_label.setText(f"Selected {selected_count} of {total_count} items ({shown_count} shown)")
+        else:
+            self.status_label.setText(f"Selected {selected_count} of {total_count} items")
+    
+    def on_items_changed(self, *args):
+        """Rebuild the search index on the next search"""
+        self.index_dirty = True
+        self.schedule_search()
+    
+    def on_item_data_changed(self, top_left, bottom_right, roles=[]):
+        # Only an item replaced by the watcher changes what the index holds
+        if not roles:
+            self.on_items_changed()
+    
+    def schedule_search(self, *args):
+        """Re-run the search shortly, so typing or a burst of new items triggers it once"""
+        self.search_timer.start()
+    
+    def apply_search(self):
+        """Filter and sort the list through the search index"""
+        if self.index_dirty:
+            self.search_index.build(self.item_model.items)
+            self.index_dirty = False
+        
+        text = self.search_edit.text().strip()
+        type_index = self.type_combo.currentIndex()
+        lpk_type = LPK_TYPE_FILTERS[type_index - 1] if type_index > 0 else None
+        _, min_size, max_size = SIZE_FILTERS[max(self.size_combo.currentIndex(), 0)]
+        _, sort = SORT_CHOICES[max(self.sort_combo.currentIndex(), 0)]
+        
+        if not text and lpk_type is None and min_size is None and max_size is None and sort is None:
+            self.item_proxy.clear_rows()
+        else:
+            self.item_proxy.set_rows(self.search_index.query(text, lpk_type, min_size, max_size, sort))
+        if self.scan_btn.isEnabled():
+            self.update_selection_count()
     
     def extract_selected(self):
         """Extract selected workshop items"""
-        selected_items = [
-            card.item_data for card in self.item_cards if card.is_selected()
-        ]
+        selected_items = self.item_model.checked_items()
         
         if not selected_items:
             InfoBar.warning(
@@ -505,6 +955,7 @@ class SteamWorkshopPage(QFrame):
         
         self.extraction_thread = BatchExtractionThread(selected_items, output_dir)
         self.extraction_thread.progressUpdated.connect(self.on_extraction_progress)
+        self.extraction_thread.itemFinished.connect(self.on_item_extracted)
         self.extraction_thread.extractionFinished.connect(self.on_extraction_finished)
         self.extraction_thread.extractionError.connect(self.on_extraction_error)
         self.extraction_thread.start()
@@ -514,6 +965,15 @@ class SteamWorkshopPage(QFrame):
         self.progress_bar.setValue(progress)
         self.status_label.setText(message)
     
+    def on_item_extracted(self, result: Dict):
+        """Log the outcome of a single extracted item"""
+        logger = logging.getLogger("SteamWorkshopPage")
+        if result['ok']:
+            logger.info(f"Extracted {result['title']} in {result['elapsed']:.1f}s")
+        else:
+            for error in result['errors']:
+                logger.error(f"Failed to extract {result['title']}: {error}")
+    
     def on_extraction_finished(self):
         """Handle extraction completion"""
         self.progress_bar.setVisible(False)
@@ -1,8 +1,51 @@
 import os
+from urllib.parse import quote
 from PyQt5.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QApplication, QFileDialog
-from PyQt5.QtCore import Qt, QUrl, QTimer
+from PyQt5.QtCore import Qt, QUrl, QThread, pyqtSignal
 from PyQt5.QtGui import QDesktopServices
-from qfluentwidgets import SubtitleLabel, PushButton, InfoBar, InfoBarPosition, LineEdit, FluentIcon
+from qfluentwidgets import SubtitleLabel, BodyLabel, PushButton, Slider, InfoBar, InfoBarPosition, LineEdit, FluentIcon
+
+
+class ModelMountThread(QThread):
+    """在后台挂载模型目录或LPK：打开LPK需要解密模型JSON，不能阻塞界面"""
+    mounted = pyqtSignal(str, str, str)
+    mountError = pyqtSignal(str, str)
+
+    def __init__(self, model_path):
+        super().__init__()
+        self.model_path = model_path
+
+    def run(self):
+        try:
+            from GUI.web_server import mount_model_folder, mount_lpk
+
+            if os.path.isfile(self.model_path):
+                # 直接挂载LPK文件，资源按需解密
+                base_path, model_filename = mount_lpk(self.model_path)
+            else:
+                # 挂载模型目录并查找其中的模型JSON文件
+                base_path, model_filename = mount_model_folder(self.model_path)
+            self.mounted.emit(self.model_path, base_path, model_filename)
+        except Exception as e:
+            self.mountError.emit(self.model_path, str(e))
+
+
+class GalleryScanThread(QThread):
+    """在后台扫描解包输出目录中的所有模型"""
+    galleryReady = pyqtSignal(str)
+    galleryError = pyqtSignal(str)
+
+    def __init__(self, folder):
+        super().__init__()
+        self.folder = folder
+
+    def run(self):
+        try:
+            from GUI.web_server import mount_gallery
+
+            self.galleryReady.emit(mount_gallery(self.folder))
+        except Exception as e:
+            self.galleryError.emit(str(e))
 
 
 class WebPreviewPage(QFrame):
@@ -10,6 +53,8 @@ class WebPreviewPage(QFrame):
         super().__init__(parent)
         self.setObjectName('webPreviewPage')  # Required for navigation
         self.current_model_path = None
+        self.mount_threads = []
+        self.gallery_thread = None
         self.server_url = None
         self.server_port = None
         
@@ -68,9 +113,17 @@ class WebPreviewPage(QFrame):
         self.model_button = PushButton("Browse", self)
         self.model_button.setIcon(FluentIcon.FOLDER)
         self.model_button.clicked.connect(self.selectModelFolder)
+        self.lpk_button = PushButton("Open LPK", self)
+        self.lpk_button.setIcon(FluentIcon.DOCUMENT)
+        self.lpk_button.clicked.connect(self.selectLpkFile)
+        self.gallery_button = PushButton("Open Gallery", self)
+        self.gallery_button.setIcon(FluentIcon.PHOTO)
+        self.gallery_button.clicked.connect(self.openGallery)
         self.model_layout.addWidget(self.model_label)
         self.model_layout.addWidget(self.model_edit, 1)
         self.model_layout.addWidget(self.model_button)
+        self.model_layout.addWidget(self.lpk_button)
+        self.model_layout.addWidget(self.gallery_button)
         self.main_layout.addLayout(self.model_layout)
         
         # 发送到浏览器按钮
@@ -80,7 +133,39 @@ class WebPreviewPage(QFrame):
         self.load_model_btn.setEnabled(False)
         self.main_layout.addWidget(self.load_model_btn)
         
+        # 实时控制：通过二进制参数流驱动浏览器预览
+        self.opacity_slider, self.opacity_value = self.addParamSlider("Opacity:", 0, 100, "opacity")
+        self.scale_slider, self.scale_value = self.addParamSlider("Scale:", 10, 300, "scale")
+        
         self.main_layout.addStretch(1)
+    
+    def addParamSlider(self, title, minimum, maximum, param):
+        """添加一个百分比滑块，拖动时把 param 以倍数发送给浏览器"""
+        layout = QHBoxLayout()
+        layout.addWidget(BodyLabel(title, self))
+        
+        slider = Slider(Qt.Horizontal, self)
+        slider.setRange(minimum, maximum)
+        slider.setValue(100)
+        
+        value_label = BodyLabel("100%", self)
+        value_label.setMinimumWidth(40)
+        
+        slider.valueChanged.connect(lambda v: value_label.setText(f"{v}%"))
+        slider.valueChanged.connect(lambda v: self.sendParams({param: v / 100}))
+        
+        layout.addWidget(slider, 1)
+        layout.addWidget(value_label)
+        self.main_layout.addLayout(layout)
+        return slider, value_label
+    
+    def sendParams(self, values):
+        """发送预览参数，服务器按60Hz合并，拖动滑块不会阻塞界面"""
+        try:
+            from GUI.web_server import set_params
+            set_params(values)
+        except RuntimeError as e:
+            print(f"⚠️ Failed to send params: {e}")
             
     
     def startWebServer(self):
@@ -176,6 +261,70 @@ class WebPreviewPage(QFrame):
             except Exception as e:
                 print(f"⚠️ Auto load failed: {e}")
     
+    def selectLpkFile(self):
+        """选择LPK文件，无需解包直接预览"""
+        start_dir = self.last_browse_dir if os.path.exists(self.last_browse_dir) else os.getcwd()
+        
+        lpk_file, _ = QFileDialog.getOpenFileName(
+            self,
+            "Select LPK File",
+            start_dir,
+            "LPK Files (*.lpk)"
+        )
+        
+        if lpk_file:
+            self.current_model_path = lpk_file
+            self.model_edit.setText(lpk_file)
+            self.load_model_btn.setEnabled(True)
+            self.last_browse_dir = os.path.dirname(lpk_file)
+            
+            print(f"✅ LPK selected: {lpk_file}")
+            
+            try:
+                self.loadModelToPreview()
+            except Exception as e:
+                print(f"⚠️ Auto load failed: {e}")
+    
+    def openGallery(self):
+        """选择解包输出目录，在浏览器中以模型库浏览其中所有模型"""
+        if not self.server_url:
+            return
+        start_dir = self.last_browse_dir if os.path.exists(self.last_browse_dir) else os.getcwd()
+
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Select Output Folder",
+            start_dir
+        )
+        if not folder:
+            return
+
+        # 扫描可能需要一段时间，完成前禁用按钮
+        self.gallery_button.setEnabled(False)
+        self.gallery_thread = GalleryScanThread(folder)
+        self.gallery_thread.galleryReady.connect(self._onGalleryReady)
+        self.gallery_thread.galleryError.connect(self._onGalleryError)
+        self.gallery_thread.finished.connect(lambda: self.gallery_button.setEnabled(True))
+        self.gallery_thread.start()
+        print(f"⏳ Scanning models in: {folder}")
+
+    def _onGalleryReady(self, gallery_path):
+        gallery_url = f"{self.server_url}{gallery_path}"
+        QDesktopServices.openUrl(QUrl(gallery_url))
+        print(f"✅ Gallery opened: {gallery_url}")
+
+    def _onGalleryError(self, error):
+        print(f"❌ Failed to open gallery: {error}")
+        InfoBar.error(
+            title="Failed",
+            content=f"Cannot open gallery: {error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        )
+
     def loadModelToPreview(self):
         """加载模型到预览器"""
         if not self.current_model_path:
@@ -190,135 +339,61 @@ class WebPreviewPage(QFrame):
             )
             return
         
+        thread = ModelMountThread(self.current_model_path)
+        thread.mounted.connect(self._onModelMounted)
+        thread.mountError.connect(self._onMountError)
+        thread.finished.connect(lambda: self.mount_threads.remove(thread))
+        self.mount_threads.append(thread)
+        thread.start()
+        print(f"⏳ Mounting model: {self.current_model_path}")
+    
+    def _onModelMounted(self, model_path, base_path, model_filename):
+        """模型挂载完成，广播给浏览器"""
+        if model_path != self.current_model_path:
+            # 挂载期间已选择了其他模型
+            return
+        
         try:
-            from GUI.web_server import mount_model_dir
-            import requests
-            import json
-            
-            # 挂载模型目录
-            base_path = mount_model_dir(self.current_model_path)
+            from GUI.web_server import broadcast, preview_client_count
             
-            # 查找模型JSON文件
-            model_json = self.findModelJson(self.current_model_path)
-            if not model_json:
-                raise Exception("No valid Live2D model JSON found")
+            # 构建模型URL，逐段编码，名称中可能含有 # % ? 或空格
+            model_url = f"{self.server_url}{base_path}/{quote(model_filename)}"
             
-            # 构建模型URL
-            model_filename = os.path.basename(model_json)
-            model_url = f"{self.server_url}{base_path}/{model_filename}"
-
-            # 预检：确认模型JSON可访问
-            try:
-                check = requests.get(model_url, timeout=2)
-                if check.status_code != 200:
-                    raise Exception(f"Model URL not accessible ({check.status_code})")
-            except Exception as e:
-                InfoBar.error(
-                    title="Model URL Error",
-                    content=f"Cannot access model JSON: {model_url}\n{e}",
-                    orient=Qt.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.TOP,
-                    duration=4000,
-                    parent=self
-                )
-                print(f"❌ Model URL precheck failed: {e}")
-                return
-            
-            # 通过 HTTP API 广播加载模型消息
-            broadcast_url = f"{self.server_url}/api/preview/broadcast"
+            # 进程内广播，不阻塞界面；服务器会保存该消息并在浏览器连接时重放
             message = {
                 "type": "loadModel",
                 "modelUrl": model_url,
                 "modelPath": model_url
             }
+            broadcast(message).add_done_callback(self._onBroadcastDone)
             
-            response = requests.post(broadcast_url, json=message, timeout=2)
-
-            if response.status_code == 200:
-                # 尝试读取服务器返回的客户端数量，提示未连接的情况
-                try:
-                    resp_json = response.json()
-                    clients = int(resp_json.get("clients", 0))
-                except Exception:
-                    clients = 0
-
-                if clients <= 0:
-                    InfoBar.warning(
-                        title="No Browser Connected",
-                        content="Preview page not connected (WS). Opening browser and will retry...",
-                        orient=Qt.Horizontal,
-                        isClosable=True,
-                        position=InfoBarPosition.TOP,
-                        duration=3000,
-                        parent=self
-                    )
-                    print(f"⚠️ No preview clients connected; model not delivered: {model_url}")
-                    # 自动打开浏览器，并在WS连接后进行多次重试广播
-                    try:
-                        self.openInBrowser()
-                    except Exception as e:
-                        print(f"⚠️ Failed to open browser automatically: {e}")
-
-                    # 保存用于重试的上下文
-                    self._last_model_url = model_url
-                    self._last_message_payload = message
-                    self._retry_attempts = 3
-
-                    def _retry_once():
-                        nonlocal broadcast_url
-                        if getattr(self, "_retry_attempts", 0) <= 0:
-                            return
-                        try:
-                            resp = requests.post(broadcast_url, json=self._last_message_payload, timeout=2)
-                            ok = False
-                            if resp.status_code == 200:
-                                try:
-                                    data = resp.json()
-                                    c = int(data.get("clients", 0))
-                                    ok = c > 0
-                                except Exception:
-                                    ok = False
-                            if ok:
-                                InfoBar.success(
-                                    title="Model Loaded",
-                                    content="Model sent to browser preview (auto retry)",
-                                    orient=Qt.Horizontal,
-                                    isClosable=True,
-                                    position=InfoBarPosition.TOP,
-                                    duration=2000,
-                                    parent=self
-                                )
-                                print(f"✅ Model loaded after retry: {self._last_model_url}")
-                                self._retry_attempts = 0
-                                return
-                            else:
-                                self._retry_attempts -= 1
-                                print(f"⏳ Retry broadcast, attempts left: {self._retry_attempts}")
-                                if self._retry_attempts > 0:
-                                    QTimer.singleShot(1200, _retry_once)
-                        except Exception as e:
-                            self._retry_attempts -= 1
-                            print(f"❌ Retry broadcast error: {e}")
-                            if self._retry_attempts > 0:
-                                QTimer.singleShot(1200, _retry_once)
-
-                    # 启动第一次重试
-                    QTimer.singleShot(1200, _retry_once)
-                    return
-
-                InfoBar.success(
-                    title="Model Loaded",
-                    content="Model sent to browser preview successfully",
+            if preview_client_count() <= 0:
+                InfoBar.warning(
+                    title="No Browser Connected",
+                    content="Opening the preview page, the model is loaded as soon as it connects",
                     orient=Qt.Horizontal,
                     isClosable=True,
                     position=InfoBarPosition.TOP,
-                    duration=2000,
+                    duration=3000,
                     parent=self
                 )
-                print(f"✅ Model loaded: {model_url}")
-            else:
-                raise Exception(f"Server error: {response.status_code}")
+                print(f"⚠️ No preview clients connected yet, model queued: {model_url}")
+                try:
+                    self.openInBrowser()
+                except Exception as e:
+                    print(f"⚠️ Failed to open browser automatically: {e}")
+                return
+
+            InfoBar.success(
+                title="Model Loaded",
+                content="Model sent to browser preview successfully",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=2000,
+                parent=self
+            )
+            print(f"✅ Model loaded: {model_url}")
         
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
@@ -332,66 +407,24 @@ class WebPreviewPage(QFrame):
                 parent=self
             )
     
-    def findModelJson(self, folder):
-        """在文件夹中查找模型JSON文件
-        
-        支持的格式：
-        - *.model3.json (Live2D Cubism 3.0+)
-        - *.model.json (Live2D Cubism 2.1)
-        - *model*.json (任何包含"model"的json文件)
-        """
-        import json
-        
-        # 优先级1: 标准的 .model3.json 文件
-        for file in os.listdir(folder):
-            if file.endswith('.model3.json'):
-                json_path = os.path.join(folder, file)
-                if self._validate_model_json(json_path):
-                    return json_path
-        
-        # 优先级2: 标准的 .model.json 文件
-        for file in os.listdir(folder):
-            if file.endswith('.model.json'):
-                json_path = os.path.join(folder, file)
-                if self._validate_model_json(json_path):
-                    return json_path
-        
-        # 优先级3: 任何包含"model"并以.json结尾的文件
-        for file in os.listdir(folder):
-            if 'model' in file.lower() and file.endswith('.json'):
-                json_path = os.path.join(folder, file)
-                if self._validate_model_json(json_path):
-                    return json_path
-        
-        # 优先级4: 尝试所有.json文件（作为最后的后备）
-        for file in os.listdir(folder):
-            if file.endswith('.json'):
-                json_path = os.path.join(folder, file)
-                if self._validate_model_json(json_path):
-                    return json_path
-        
-        return None
+    def _onMountError(self, model_path, error):
+        if model_path != self.current_model_path:
+            return
+        print(f"❌ Failed to load model: {error}")
+        InfoBar.error(
+            title="Load Failed",
+            content=f"Cannot load model: {error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        )
     
-    def _validate_model_json(self, json_path):
-        """验证JSON文件是否为有效的Live2D模型文件"""
-        try:
-            import json
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, dict):
-                return False
-            
-            fr = data.get('FileReferences')
-            if isinstance(fr, dict) and isinstance(fr.get('Moc'), str):
-                return True
-            if isinstance(data.get('model'), str) and isinstance(data.get('textures'), list):
-                return True
-            return False
-            
-        except Exception as e:
-            print(f"⚠️ Failed to validate {json_path}: {e}")
-            return False
+    def _onBroadcastDone(self, future):
+        """Runs in the server thread, so only log here"""
+        if future.exception() is not None:
+            print(f"❌ Broadcast failed: {future.exception()}")
     
     def updateUIScale(self, window_width, window_height):
         """根据窗口大小调整UI元素"""
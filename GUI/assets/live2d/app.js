@@ -1,4 +1,11 @@
 // Live2D Web 预览器 - 主应用逻辑
+
+// 参数流中驱动页面滑块的参数（值为倍数，滑块为百分比）
+const TRANSFORM_SLIDERS = {
+    opacity: 'opacity-slider',
+    scale: 'scale-slider'
+};
+
 class Live2DApp {
     constructor() {
         this.app = null;
@@ -10,6 +17,10 @@ class Live2DApp {
         this.ws = null;
         this.wsReconnectTimer = null;
         
+        // 二进制参数流：索引 -> 参数名，以及最新的模型参数值
+        this.paramTable = [];
+        this.paramValues = {};
+        
         // Canvas 尺寸
         this.canvasWidth = 0;
         this.canvasHeight = 0;
@@ -343,6 +354,7 @@ class Live2DApp {
             document.getElementById('ws-url').textContent = wsUrl;
             
             this.ws = new WebSocket(wsUrl);
+            this.ws.binaryType = 'arraybuffer';
             
             this.ws.onopen = () => {
                 this.log('✅ WebSocket connected');
@@ -354,6 +366,10 @@ class Live2DApp {
             };
             
             this.ws.onmessage = (event) => {
+                if (event.data instanceof ArrayBuffer) {
+                    this.handleParamFrame(event.data);
+                    return;
+                }
                 try {
                     const msg = JSON.parse(event.data);
                     this.handleMessage(msg);
@@ -416,6 +432,10 @@ class Live2DApp {
         try {
             switch(data.type) {
                 case 'loadModel':
+                    // replayed on (re)connect, skip if this model is already on screen
+                    if (data.replay && this.model && this.modelPath === (data.modelUrl || data.modelPath)) {
+                        break;
+                    }
                     this.loadModel(data.modelUrl || data.modelPath, data.modelData);
                     break;
                 case 'setExpression':
@@ -430,12 +450,55 @@ class Live2DApp {
                 case 'updateCanvas':
                     this.handleResize();
                     break;
+                case 'paramTable':
+                    this.paramTable = data.params || [];
+                    break;
             }
         } catch (error) {
             this.log('❌ Message handling failed:', error);
         }
     }
     
+    // 帧格式：uint16 数量，然后是 (uint16 参数索引, float32 值)，小端序
+    handleParamFrame(buffer) {
+        const view = new DataView(buffer);
+        const count = view.getUint16(0, true);
+        for (let i = 0; i < count; i++) {
+            const offset = 2 + i * 6;
+            const name = this.paramTable[view.getUint16(offset, true)];
+            const value = view.getFloat32(offset + 2, true);
+            if (name === undefined) continue;
+            
+            const sliderId = TRANSFORM_SLIDERS[name];
+            if (sliderId) {
+                this.setSlider(sliderId, Math.round(value * 100));
+            } else {
+                this.paramValues[name] = value;
+            }
+        }
+    }
+    
+    setSlider(id, value) {
+        const el = document.getElementById(id);
+        // 每帧都包含全部参数，只在变化时触发
+        if (!el || parseFloat(el.value) === value) return;
+        el.value = value;
+        el.dispatchEvent(new Event('input'));
+    }
+    
+    // 在每次模型更新前应用参数，避免被动作覆盖
+    applyParams() {
+        const core = this.model && this.model.internalModel && this.model.internalModel.coreModel;
+        if (!core) return;
+        for (const [name, value] of Object.entries(this.paramValues)) {
+            if (core.setParameterValueById) {
+                core.setParameterValueById(name, value);  // Cubism 3/4
+            } else if (core.setParamFloat) {
+                core.setParamFloat(name, value);  // Cubism 2
+            }
+        }
+    }
+    
     async loadModel(modelPath, modelData) {
         try {
             this.log('🎭 Loading model:', modelPath);
@@ -460,6 +523,7 @@ class Live2DApp {
             if (PIXI.live2d) {
                 this.model = await PIXI.live2d.Live2DModel.from(modelPath);
                 this.app.stage.addChild(this.model);
+                this.model.internalModel.on('beforeModelUpdate', () => this.applyParams());
                 
                 // 等待一帧
                 await new Promise(resolve => requestAnimationFrame(resolve));
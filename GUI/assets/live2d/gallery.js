@@ -0,0 +1,195 @@
+// Live2D 模型库 - 只为视口内的卡片创建模型，滚出视口即销毁
+
+// 每页请求的模型数量
+const PAGE_SIZE = 48;
+// 每张卡片占用一个 WebGL 上下文，浏览器同时只允许少量（通常 16 个）
+const MAX_ACTIVE_TILES = 12;
+// 同时加载的模型数量
+const MAX_LOADING = 2;
+// 与 gallery.html 中 .tile 的尺寸一致
+const TILE_WIDTH = 240;
+const TILE_HEIGHT = 320;
+
+class Live2DGallery {
+    constructor(galleryId) {
+        this.galleryId = galleryId;
+        this.total = null;
+        this.offset = 0;
+        this.fetching = false;
+
+        this.grid = document.getElementById('gallery-grid');
+        this.status = document.getElementById('gallery-status');
+        this.sentinel = document.getElementById('gallery-sentinel');
+
+        // 已创建模型的卡片 -> { app, model }
+        this.active = new Map();
+        // 等待创建模型的可见卡片
+        this.queue = [];
+        this.loading = 0;
+
+        this.tileObserver = new IntersectionObserver(
+            entries => this.onTilesIntersect(entries),
+            { rootMargin: '100px' }
+        );
+        // 滚动到底部附近时加载下一页
+        this.pageObserver = new IntersectionObserver(
+            entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadPage();
+                }
+            },
+            { rootMargin: '600px' }
+        );
+        this.pageObserver.observe(this.sentinel);
+    }
+
+    hasMore() {
+        return this.total === null || this.offset < this.total;
+    }
+
+    async loadPage() {
+        if (this.fetching || !this.hasMore()) return;
+        this.fetching = true;
+        try {
+            const resp = await fetch(`/api/gallery/${this.galleryId}?offset=${this.offset}&limit=${PAGE_SIZE}`);
+            if (!resp.ok) {
+                throw new Error(`HTTP ${resp.status}`);
+            }
+            const page = await resp.json();
+            this.total = page.total;
+            this.offset = page.offset + page.items.length;
+            page.items.forEach(item => this.addTile(item));
+            this.status.textContent = this.total ? `${this.offset} / ${this.total}` : 'No models found';
+        } catch (e) {
+            console.error('❌ Failed to load gallery:', e);
+            this.status.textContent = `❌ ${e.message}`;
+            this.total = this.offset;
+        } finally {
+            this.fetching = false;
+        }
+
+        // 一页填不满视口时观察器不会再次触发，继续加载
+        if (this.hasMore() && this.sentinel.getBoundingClientRect().top < window.innerHeight + 600) {
+            this.loadPage();
+        }
+    }
+
+    addTile(item) {
+        const tile = document.createElement('div');
+        tile.className = 'tile';
+        tile.title = item.path;
+        tile.dataset.url = item.url;
+
+        const name = document.createElement('div');
+        name.className = 'tile-name';
+        name.textContent = item.name;
+        tile.appendChild(name);
+
+        tile.addEventListener('click', () => this.preview(item));
+        this.grid.appendChild(tile);
+        this.tileObserver.observe(tile);
+    }
+
+    onTilesIntersect(entries) {
+        for (const entry of entries) {
+            const tile = entry.target;
+            if (entry.isIntersecting) {
+                if (!this.active.has(tile) && !this.queue.includes(tile)) {
+                    this.queue.push(tile);
+                }
+            } else {
+                this.queue = this.queue.filter(queued => queued !== tile);
+                this.dispose(tile);
+            }
+        }
+        this.pump();
+    }
+
+    pump() {
+        while (this.queue.length && this.active.size < MAX_ACTIVE_TILES && this.loading < MAX_LOADING) {
+            this.activate(this.queue.shift());
+        }
+    }
+
+    async activate(tile) {
+        const canvas = document.createElement('canvas');
+        tile.insertBefore(canvas, tile.firstChild);
+        const app = new PIXI.Application({
+            view: canvas,
+            width: TILE_WIDTH,
+            height: TILE_HEIGHT,
+            backgroundAlpha: 0,
+            resolution: window.devicePixelRatio || 1,
+            autoDensity: true
+        });
+        const entry = { app, model: null };
+        this.active.set(tile, entry);
+
+        this.loading++;
+        try {
+            const model = await PIXI.live2d.Live2DModel.from(tile.dataset.url, { autoInteract: false });
+            if (this.active.get(tile) !== entry) {
+                // 加载期间已滚出视口
+                model.destroy();
+                return;
+            }
+            entry.model = model;
+            app.stage.addChild(model);
+            this.fitModel(model);
+        } catch (e) {
+            console.warn(`⚠️ Failed to load ${tile.dataset.url}:`, e);
+            tile.classList.add('failed');
+        } finally {
+            this.loading--;
+            this.pump();
+        }
+    }
+
+    fitModel(model) {
+        model.anchor.set(0.5, 0.5);
+        const scale = Math.min(TILE_WIDTH / model.width, TILE_HEIGHT / model.height) * 0.95;
+        model.scale.set(scale);
+        model.x = TILE_WIDTH / 2;
+        model.y = TILE_HEIGHT / 2;
+    }
+
+    dispose(tile) {
+        const entry = this.active.get(tile);
+        if (!entry) return;
+        this.active.delete(tile);
+        // 同时释放纹理、画布和 WebGL 上下文
+        entry.app.destroy(true, { children: true, texture: true, baseTexture: true });
+    }
+
+    async preview(item) {
+        const message = {
+            type: 'loadModel',
+            modelUrl: location.origin + item.url,
+            modelPath: location.origin + item.url
+        };
+        try {
+            const resp = await fetch('/api/preview/broadcast', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(message)
+            });
+            const result = await resp.json();
+            // 没有打开的预览页时新开一个，服务器会在连接时重放该模型
+            if (!result.clients) {
+                window.open('web.html', '_blank');
+            }
+        } catch (e) {
+            console.error('❌ Failed to send model to preview:', e);
+        }
+    }
+}
+
+window.addEventListener('DOMContentLoaded', () => {
+    const galleryId = new URLSearchParams(location.search).get('gallery');
+    if (!galleryId) {
+        document.getElementById('gallery-status').textContent = 'No gallery selected';
+        return;
+    }
+    window.gallery = new Live2DGallery(galleryId);
+    window.gallery.loadPage();
+});
@@ -1,16 +1,28 @@
 import os
 import sys
 import socket
+import asyncio
+import concurrent.futures
 import threading
 import json
+import gzip
+import struct
 from pathlib import Path
+from collections import OrderedDict
+
+import anyio
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import NotModifiedResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uuid
-from typing import Dict, Set
+import mimetypes
+from hashlib import md5
+from urllib.parse import quote
+from typing import Dict, List, Optional, Tuple, Union
 
 
 def _resolve_assets_dir() -> Path:
@@ -43,6 +55,261 @@ def _resolve_assets_dir() -> Path:
 
 assets_dir = _resolve_assets_dir()
 
+# ---------------- HTTP caching for model assets ----------------
+
+# an lpk mount only ever serves one version of the archive
+IMMUTABLE = "public, max-age=31536000, immutable"
+# extracted folders can be rewritten in place, revalidate (a cheap 304) on every use
+REVALIDATE = "no-cache"
+
+
+def _etag(size: int, mtime_ns: int, path: str = "") -> str:
+    """Strong ETag from size and mtime, plus the path for files sharing one archive"""
+    tag = f"{size:x}-{mtime_ns:x}"
+    if path:
+        tag += "-" + md5(path.encode("utf8")).hexdigest()[:8]
+    return f'"{tag}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single "bytes=" range, None to send the whole file.
+
+    Raises ValueError if the range cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start, _, end = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            first = int(start)
+            last = min(int(end), size - 1) if end else size - 1
+        else:
+            # suffix range: the last N bytes
+            first = max(size - int(end), 0)
+            last = size - 1
+    except ValueError:
+        return None
+    if first > last or first >= size:
+        raise ValueError(range_header)
+    return first, last
+
+
+class ModelStaticFiles(StaticFiles):
+    """StaticFiles for model folders with strong ETags and revalidation.
+
+    FileResponse answers Range requests and If-None-Match with 304 itself.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        headers = {
+            "ETag": _etag(stat_result.st_size, stat_result.st_mtime_ns),
+            "Cache-Control": REVALIDATE,
+        }
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+# ---------------- Response compression ----------------
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# preferred first; brotli is optional
+ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+COMPRESSIBLE_SUFFIXES = {".js", ".json", ".html", ".css", ".svg", ".txt"}
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml", "image/svg+xml"}
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best of ENCODINGS the client accepts, None for identity"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                pass
+        accepted[name.strip()] = q
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def _compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+
+def _compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else 5)
+    return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+
+
+def _weak_etag(etag: str) -> str:
+    # an encoded body is a different representation of the same content
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+class CompressionMiddleware:
+    """Compress complete text responses (JSON model files, ...) of at least ``minimum_size`` bytes.
+
+    Responses that are already encoded, not 200 (e.g. 206 ranges) or larger than
+    ``maximum_size`` pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, maximum_size: int = 8 * 1024 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.maximum_size = maximum_size
+
+    async def __call__(self, scope, receive, send):
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", "")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or "content-encoding" in headers or not _compressible(headers.get("content-type", "")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body":
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+            size = sum(len(chunk) for chunk in chunks)
+            if more_body and size <= self.maximum_size:
+                return
+            body = b"".join(chunks)
+            if more_body or size < self.minimum_size:
+                # too large to buffer or too small to be worth it
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            body = await anyio.to_thread.run_sync(_compress, body, encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = _weak_etag(headers["etag"])
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles serving text assets (vendor bundles, app.js, ...) precompressed.
+
+    Every file is compressed once per encoding at the best level on a background
+    thread and kept in memory until it changes on disk. Until then the file is
+    served as is and CompressionMiddleware compresses it at the default level.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compressed: Dict[Tuple[str, str], Tuple[Tuple[int, int], bytes]] = {}
+        self.pending = set()
+        # only guards the dicts, never held while compressing
+        self.lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompress")
+
+    def compressed_body(self, full_path: str, stat_result: os.stat_result, encoding: str) -> Optional[bytes]:
+        """The compressed body if it is ready, else schedules it and returns None"""
+        signature = (stat_result.st_size, stat_result.st_mtime_ns)
+        with self.lock:
+            cached = self.compressed.get((full_path, encoding))
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        self.schedule(full_path, encoding)
+        return None
+
+    def schedule(self, full_path: str, encoding: str):
+        with self.lock:
+            if (full_path, encoding) in self.pending:
+                return
+            self.pending.add((full_path, encoding))
+        self.executor.submit(self.compress_file, full_path, encoding)
+
+    def compress_file(self, full_path: str, encoding: str):
+        try:
+            st = os.stat(full_path)
+            with open(full_path, "rb") as f:
+                body = _compress(f.read(), encoding, best=True)
+        except OSError:
+            body = None
+        with self.lock:
+            self.pending.discard((full_path, encoding))
+            if body is not None:
+                # stat taken before reading, a concurrent rewrite only causes another pass
+                self.compressed[(full_path, encoding)] = ((st.st_size, st.st_mtime_ns), body)
+
+    def precompress(self):
+        """Queue every text asset for compression, called once at server startup"""
+        for root, _, files in os.walk(str(self.directory)):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in COMPRESSIBLE_SUFFIXES:
+                    path = os.path.join(root, name)
+                    for encoding in ENCODINGS:
+                        self.schedule(path, encoding)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        # runs on the event loop, so it only ever uses a body that is already compressed
+        request_headers = Headers(scope=scope)
+        encoding = _choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None or os.path.splitext(str(full_path))[1].lower() not in COMPRESSIBLE_SUFFIXES:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        body = self.compressed_body(str(full_path), stat_result, encoding)
+        if body is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        etag = _etag(stat_result.st_size, stat_result.st_mtime_ns)
+        headers = {
+            "ETag": _weak_etag(etag),
+            "Cache-Control": REVALIDATE,
+            "Content-Encoding": encoding,
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(request_headers.get("if-none-match"), etag):
+            return NotModifiedResponse(Headers(headers=headers))
+        media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+        return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
 app = FastAPI(title="LpkUnpacker Web Proxy")
 
 # 添加CORS中间件支持跨域请求
@@ -54,8 +321,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
 # Mount static files at /static so relative paths in index.html (../vender/...) resolve to /static/vender/...
-app.mount("/static", StaticFiles(directory=str(assets_dir), html=True), name="static")
+static_files = PrecompressedStaticFiles(directory=str(assets_dir), html=True)
+app.mount("/static", static_files, name="static")
 
 
 @app.get("/")
@@ -71,16 +341,26 @@ async def favicon():
     return Response(status_code=404)
 
 
-def _find_free_port(host: str = "127.0.0.1") -> int:
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind((host, 0))
-    port = s.getsockname()[1]
-    s.close()
-    return port
+def _bind_socket(host: str, port: int) -> socket.socket:
+    """Bind and listen before uvicorn starts, so the port is known and can't be taken meanwhile"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    return sock
 
 
-def start_server(host: str = "127.0.0.1", port: int = 0) -> int:
-    """Start uvicorn server as a daemon thread and return the actual port.
+# set once the server accepts connections
+server_ready = threading.Event()
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """Block until the server accepts connections, False on timeout"""
+    return server_ready.wait(timeout)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, timeout: float = 10.0) -> int:
+    """Start uvicorn server as a daemon thread and return the actual port once it is ready.
 
     Uses a minimal logging configuration to avoid dynamic formatter imports
     (e.g., 'uvicorn.logging.DefaultFormatter') that can break in packaged builds.
@@ -90,7 +370,19 @@ def start_server(host: str = "127.0.0.1", port: int = 0) -> int:
     except ImportError:
         raise RuntimeError("uvicorn is required to start the web proxy. Please install 'uvicorn'.")
 
-    actual_port = port or _find_free_port(host)
+    class ReadyServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            global _server_loop
+            await super().startup(sockets=sockets)
+            if not self.should_exit:
+                _server_loop = asyncio.get_running_loop()
+                server_ready.set()
+
+    sock = _bind_socket(host, port)
+    actual_port = sock.getsockname()[1]
+
+    # compress the vendor bundles once instead of on every page load
+    threading.Thread(target=static_files.precompress, daemon=True).start()
 
     config = uvicorn.Config(
         app,
@@ -98,25 +390,75 @@ def start_server(host: str = "127.0.0.1", port: int = 0) -> int:
         port=actual_port,
         log_level="info",
     )
-    server = uvicorn.Server(config)
+    server = ReadyServer(config)
 
     # 启动服务器线程
-    t = threading.Thread(target=server.run, daemon=True)
+    server_ready.clear()
+    t = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
     t.start()
-    
-    # 等待一小段时间确保服务器完全启动
-    import time
-    time.sleep(0.8)
-    
+
+    if not wait_until_ready(timeout):
+        raise RuntimeError(f"Web server did not start within {timeout}s")
     return actual_port
 
 
-# ---------------- Dynamic model directory mounting ----------------
+# ---------------- Model mounting ----------------
+
+class ModelRegistry:
+    """Mounted models by id, the least recently used dropped beyond ``capacity``.
+
+    A model is an extracted folder (a ModelStaticFiles app) or an LpkSource.
+    Lookups by id and by resolved path are dict accesses, however many models
+    have been previewed.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        # mount id -> (resolved path, source)
+        self.mounts: "OrderedDict[str, Tuple[str, object]]" = OrderedDict()
+        # resolved path -> mount id
+        self.ids: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def get(self, mount_id: str):
+        with self.lock:
+            entry = self.mounts.get(mount_id)
+            if entry is None:
+                return None
+            self.mounts.move_to_end(mount_id)
+            return entry[1]
+
+    def find(self, key: str) -> Optional[str]:
+        with self.lock:
+            return self.ids.get(key)
+
+    def add(self, key: str, source) -> str:
+        mount_id = uuid.uuid4().hex[:8]
+        with self.lock:
+            old_id = self.ids.get(key)
+            if old_id is not None:
+                del self.mounts[old_id]
+            self.mounts[mount_id] = (key, source)
+            self.ids[key] = mount_id
+            while len(self.mounts) > self.capacity:
+                _, (old_key, _) = self.mounts.popitem(last=False)
+                del self.ids[old_key]
+        return mount_id
+
+    def remove(self, mount_id: str) -> bool:
+        with self.lock:
+            entry = self.mounts.pop(mount_id, None)
+            if entry is None:
+                return False
+            del self.ids[entry[0]]
+            return True
+
+
+_models = ModelRegistry()
 
-_mounted_models: Dict[str, Path] = {}
 
 def mount_model_dir(dir_path: str) -> str:
-    """Mount a local directory under a unique URL prefix and return the base path.
+    """Serve a local directory under a unique URL prefix and return the base path.
 
     Example return: "/model/abcde" so a file "model.json" becomes "/model/abcde/model.json".
 
@@ -128,52 +470,353 @@ def mount_model_dir(dir_path: str) -> str:
         raise ValueError(f"Model directory does not exist: {dir_path}")
 
     # Reuse existing mount if already mounted
-    for mount_id, mounted_path in _mounted_models.items():
-        if mounted_path.resolve() == p.resolve():
-            return f"/model/{mount_id}"
+    key = str(p.resolve())
+    mount_id = _models.find(key)
+    if mount_id is None:
+        mount_id = _models.add(key, ModelStaticFiles(directory=key, html=False))
+    return f"/model/{mount_id}"
+
 
-    # Create a new unique mount id
-    mount_id = uuid.uuid4().hex[:8]
-    base_path = f"/model/{mount_id}"
-    app.mount(base_path, StaticFiles(directory=str(p), html=False), name=f"model_{mount_id}")
-    _mounted_models[mount_id] = p
-    return base_path
+def mount_model_folder(dir_path: str) -> Tuple[str, str]:
+    """Serve an extracted model folder, return ``(base_path, model_json)`` like mount_lpk"""
+    from Core.model_discovery import find_model_json
+
+    # checked first, a folder without a model must not take a slot in the registry
+    model_json = find_model_json(dir_path)
+    if model_json is None:
+        raise ValueError(f"No valid Live2D model JSON found in {dir_path}")
+    return mount_model_dir(dir_path), os.path.basename(model_json)
+
+
+def mount_lpk(lpk_path: str, config_path: str = None) -> Tuple[str, str]:
+    """Serve an lpk without extracting it, return ``(base_path, model_json)``.
+
+    Files are addressed by the path extraction would give them, e.g.
+    "/model/abcde/Pack/model0.json", and decrypted on first request.
+    """
+    from Core.lpk_source import LpkSource
+
+    p = Path(lpk_path)
+    if not p.is_file():
+        raise ValueError(f"LPK file does not exist: {lpk_path}")
+
+    key = str(p.resolve())
+    mount_id = _models.find(key)
+    source = _models.get(mount_id) if mount_id else None
+    # responses of an lpk mount are cached as immutable, a modified archive gets a new URL
+    if source is None or source.changed():
+        source = LpkSource(key, config_path)
+        if not source.model_jsons():
+            raise ValueError(f"No model found in {lpk_path}")
+        mount_id = _models.add(key, source)
+    return f"/model/{mount_id}", source.model_jsons()[0]
+
+
+def unmount_model(mount_id: str) -> bool:
+    """Stop serving a mounted folder or lpk, returns False if it was not mounted"""
+    return _models.remove(mount_id)
+
+
+@app.get("/model/{mount_id}/{file_path:path}")
+async def model_file(mount_id: str, file_path: str, request: Request):
+    source = _models.get(mount_id)
+    if source is None:
+        return Response(status_code=404)
+    if isinstance(source, ModelStaticFiles):
+        return await source.get_response(os.path.normpath(os.path.join(*file_path.split("/"))), request.scope)
+    return await anyio.to_thread.run_sync(_lpk_response, source, file_path, request)
+
+
+@app.delete("/api/models/{mount_id}")
+def delete_model(mount_id: str):
+    return {"ok": unmount_model(mount_id)}
+
+
+def _lpk_response(source, file_path: str, request: Request) -> Response:
+    size = source.size(file_path)
+    if size is None:
+        return Response(status_code=404)
+
+    etag = _etag(*source.signature, file_path)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE, "Accept-Ranges": "bytes"}
+    # answered without decrypting anything
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    data = source.read(file_path)
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = _parse_range(request.headers.get("range"), len(data)) if if_range in (None, etag) else None
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{len(data)}"
+        return Response(status_code=416, headers=headers)
+    if byte_range is None:
+        return Response(content=data, media_type=media_type, headers=headers)
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+    return Response(content=data[first:last + 1], status_code=206, media_type=media_type, headers=headers)
+
+
+# ---------------- Model gallery ----------------
+
+GALLERY_PAGE_SIZE = 48
+GALLERY_MAX_PAGE_SIZE = 200
+
+# gallery id -> (root folder, base path of its mount, model JSON paths relative to it)
+_galleries: Dict[str, Tuple[str, str, List[str]]] = {}
+# resolved root -> gallery id
+_gallery_ids: Dict[str, str] = {}
+
+
+def mount_gallery(root: str) -> str:
+    """Index every model below an output root and return the URL path of its gallery page.
+
+    The folder is scanned again on every call, so a reopened gallery shows newly
+    extracted models under the same id; unchanged folders are not listed again.
+    Scanning a large library takes a while, call this off the GUI thread.
+    """
+    from Core.model_discovery import scan_models
+
+    p = Path(root)
+    if not p.is_dir():
+        raise ValueError(f"Gallery folder does not exist: {root}")
+
+    key = str(p.resolve())
+    models = scan_models(key)
+    gallery_id = _gallery_ids.get(key) or uuid.uuid4().hex[:8]
+    _gallery_ids[key] = gallery_id
+    _galleries[gallery_id] = (key, mount_model_dir(key), models)
+    return f"/static/live2d/gallery.html?gallery={gallery_id}"
+
+
+@app.get("/api/gallery/{gallery_id}")
+def gallery_models(gallery_id: str, offset: int = 0, limit: int = GALLERY_PAGE_SIZE):
+    """One page of a gallery: ``{"total", "offset", "items": [{"name", "path", "url"}]}``"""
+    gallery = _galleries.get(gallery_id)
+    if gallery is None:
+        return Response(status_code=404)
+    root, base_path, models = gallery
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), GALLERY_MAX_PAGE_SIZE)
+    if _models.get(base_path.rsplit("/", 1)[1]) is None:
+        # the root mount was dropped from the LRU since the gallery was opened
+        base_path = mount_model_dir(root)
+        _galleries[gallery_id] = (root, base_path, models)
+    items = []
+    for path in models[offset:offset + limit]:
+        items.append({
+            # extracted items share inner folder names like "Pack", so show the whole folder path
+            "name": path.rpartition("/")[0] or path,
+            "path": path,
+            "url": f"{base_path}/{quote(path)}",
+        })
+    return {"total": len(models), "offset": offset, "items": items}
 
 
 # ---------------- Preview message bus (WebSocket + HTTP broadcast) ----------------
 
-_preview_clients: Set[WebSocket] = set()
+# pending messages of these types replace each other, others only replace their own type
+COALESCE_KEYS = {"loadModel": "model", "clearModel": "model"}
+# still valid after a model change, every other pending message refers to the previous model
+MODEL_INDEPENDENT_KEYS = {"paramTable", "params"}
 
 
-@app.websocket("/ws/preview")
-async def ws_preview(ws: WebSocket):
-    await ws.accept()
-    _preview_clients.add(ws)
+class PreviewClient:
+    """One /ws/preview connection with its own bounded send queue.
+
+    A writer task sends the queue, so a slow tab only delays itself. A message
+    replaces a pending, not yet sent one with the same coalescing key in place,
+    so it keeps its order relative to the other pending messages. Queuing a model
+    change drops the pending messages meant for the previous model. Beyond
+    ``max_pending`` the oldest message is dropped. A send taking longer than ``send_timeout`` disconnects the client.
+    """
+
+    def __init__(self, ws: WebSocket, max_pending: int = 16, send_timeout: float = 5.0):
+        self.ws = ws
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.pending: "OrderedDict[str, Union[str, bytes]]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, key: str, data: Union[str, bytes]):
+        """Queue a JSON text or binary frame"""
+        if key == "model":
+            for old_key in [k for k in self.pending if k not in MODEL_INDEPENDENT_KEYS]:
+                del self.pending[old_key]
+        self.pending[key] = data
+        while len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.wakeup.set()
+
+    async def run(self):
+        try:
+            while not self.closed:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.pending and not self.closed:
+                    _, data = self.pending.popitem(last=False)
+                    send = self.ws.send_bytes if isinstance(data, bytes) else self.ws.send_text
+                    await asyncio.wait_for(send(data), self.send_timeout)
+        except Exception:
+            # timed out or disconnected, ws_preview returns once run() does
+            self.close()
+            try:
+                await asyncio.wait_for(self.ws.close(), 1.0)
+            except Exception:
+                pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.wakeup.set()
+        _preview_clients.pop(self.ws, None)
+
+
+_preview_clients: Dict[WebSocket, PreviewClient] = {}
+# the model on display, replayed to clients that connect later
+_last_model_message: Optional[dict] = None
+# event loop of the server thread, for broadcasts from other threads
+_server_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _coalesce_key(message: dict) -> str:
+    kind = str(message.get("type"))
+    return COALESCE_KEYS.get(kind, kind)
+
+
+async def _receive_until_disconnect(ws: WebSocket):
     try:
         while True:
             # We don't expect messages from clients; just keep the connection alive
             await ws.receive_text()
     except WebSocketDisconnect:
-        try:
-            _preview_clients.remove(ws)
-        except KeyError:
-            pass
+        pass
 
 
-async def _broadcast_to_clients(message: dict):
-    # Send to a snapshot of current clients to avoid set mutation issues
-    dead_clients = []
-    for ws in list(_preview_clients):
-        try:
-            await ws.send_text(json.dumps(message))
-        except Exception:
-            dead_clients.append(ws)
-    # Cleanup dead clients
-    for ws in dead_clients:
-        try:
-            _preview_clients.remove(ws)
-        except KeyError:
-            pass
+@app.websocket("/ws/preview")
+async def ws_preview(ws: WebSocket):
+    await ws.accept()
+    client = PreviewClient(ws)
+    _preview_clients[ws] = client
+    writer = asyncio.create_task(client.run())
+    reader = asyncio.create_task(_receive_until_disconnect(ws))
+    try:
+        if _last_model_message is not None:
+            client.push("model", json.dumps(dict(_last_model_message, replay=True)))
+        _params.replay(client)
+        # a stalled tab never disconnects by itself, so whichever side ends first ends the
+        # handler and the server closes the transport
+        await asyncio.wait({writer, reader}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        client.close()
+        writer.cancel()
+        reader.cancel()
+
+
+async def _broadcast_to_clients(message: dict) -> int:
+    global _last_model_message
+    if message.get("type") == "loadModel":
+        _last_model_message = message
+    elif message.get("type") == "clearModel":
+        _last_model_message = None
+
+    # serialized once, every client sends from its own queue
+    text = json.dumps(message)
+    key = _coalesce_key(message)
+    for client in list(_preview_clients.values()):
+        client.push(key, text)
+    return len(_preview_clients)
+
+
+def broadcast(message: dict) -> "concurrent.futures.Future":
+    """Broadcast from any thread without blocking, the future resolves to the client count.
+
+    A loadModel message is also kept and sent to every client that connects later.
+    """
+    if _server_loop is None:
+        raise RuntimeError("Web server is not running")
+    return asyncio.run_coroutine_threadsafe(_broadcast_to_clients(message), _server_loop)
+
+
+def preview_client_count() -> int:
+    return len(_preview_clients)
+
+
+# ---------------- Live parameter stream ----------------
+
+PARAM_FPS = 60
+
+
+class ParamStream:
+    """Latest preview parameter values, sent as binary frames at most PARAM_FPS times a second.
+
+    A frame is a little-endian uint16 count followed by (uint16 index, float32 value)
+    pairs, the indexes referring to the names of the last ``paramTable`` message.
+    Model parameters use their Live2D ids; ``opacity`` and ``scale`` drive the page's
+    own sliders. Every frame carries all values, so a newer frame can always replace
+    one a client has not been sent yet. Runs on the server loop only.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.values: Dict[int, float] = {}
+        self.table_changed = False
+        self.flush_handle = None
+        self.last_flush = 0.0
+
+    def update(self, values: Dict[str, float]):
+        for name, value in values.items():
+            i = self.index.get(name)
+            if i is None:
+                i = self.index[name] = len(self.names)
+                self.names.append(name)
+                self.table_changed = True
+            self.values[i] = float(value)
+        if self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            delay = max(0.0, self.last_flush + 1.0 / PARAM_FPS - loop.time())
+            self.flush_handle = loop.call_later(delay, self.flush)
+
+    def table_message(self) -> str:
+        return json.dumps({"type": "paramTable", "params": self.names})
+
+    def frame(self) -> bytes:
+        pairs = [x for item in self.values.items() for x in item]
+        return struct.pack("<H" + "Hf" * len(self.values), len(self.values), *pairs)
+
+    def flush(self):
+        self.flush_handle = None
+        self.last_flush = asyncio.get_running_loop().time()
+        table = self.table_message() if self.table_changed else None
+        self.table_changed = False
+        frame = self.frame()
+        for client in list(_preview_clients.values()):
+            if table is not None:
+                client.push("paramTable", table)
+            client.push("params", frame)
+
+    def replay(self, client: PreviewClient):
+        if self.values:
+            client.push("paramTable", self.table_message())
+            client.push("params", self.frame())
+
+
+_params = ParamStream()
+
+
+def set_params(values: Dict[str, float]):
+    """Set preview parameters from any thread, e.g. on every slider move"""
+    if _server_loop is None:
+        raise RuntimeError("Web server is not running")
+    _server_loop.call_soon_threadsafe(_params.update, dict(values))
 
 
 @app.post("/api/preview/broadcast")
@@ -183,5 +826,5 @@ async def http_broadcast(request: Request):
         payload = await request.json()
     except Exception:
         payload = {"type": "error", "message": "Invalid JSON"}
-    await _broadcast_to_clients(payload)
-    return {"ok": True, "clients": len(_preview_clients)}
\ No newline at end of file
+    clients = await _broadcast_to_clients(payload)
+    return {"ok": True, "clients": clients}
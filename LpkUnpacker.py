@@ -1,21 +1,159 @@
 import sys
+import time
+import json
 import argparse
 from Core.lpk_loader import *
 
+def add_filter_arguments(p: argparse.ArgumentParser):
+    p.add_argument("--character", action="append", dest="characters", metavar="NAME", help="only extract this character, can be repeated")
+    p.add_argument("--costume", action="append", dest="costumes", type=int, metavar="INDEX", help="only extract the costume with this index (from 0), can be repeated")
+    p.add_argument("--file-type", action="append", dest="file_types", metavar="EXT", help="only write files of this type (moc3, png, json, ...), can be repeated; model JSONs are always written")
+
+def get_filters(args) -> dict:
+    return {"characters": args.characters, "costumes": args.costumes, "types": args.file_types}
+
 parser = argparse.ArgumentParser()
 parser.add_argument("-v", "--verbosity", action="count", default=0, help="increase output verbosity")
 parser.add_argument("-c", "--config", help="config.json")
+parser.add_argument("--dry-run", action="store_true", help="list the files that would be written and estimate the time, without writing anything")
+add_filter_arguments(parser)
 parser.add_argument("target_lpk", help="path to lpk file")
 parser.add_argument("output_dir", help="directory to store result")
+
+workshop_parser = argparse.ArgumentParser(
+    prog="LpkUnpacker.py workshop",
+    description="scan a steam workshop folder and extract its lpk files in parallel",
+)
+workshop_parser.add_argument("-v", "--verbosity", action="count", default=0, help="increase output verbosity")
+workshop_parser.add_argument("-w", "--workshop-path", help="workshop content folder, e.g. .../steamapps/workshop/content/616720 (required when steam can't be located)")
+workshop_parser.add_argument("-s", "--steam-path", help="steam installation folder to locate the workshop folder from")
+workshop_parser.add_argument("-t", "--type", action="append", dest="types", metavar="TYPE", help="only extract lpks of this type (STM_1_0, STD2_0, ...), can be repeated")
+workshop_parser.add_argument("--updated-within", type=float, metavar="DAYS", help="only extract items updated within the last DAYS days")
+workshop_parser.add_argument("-j", "--jobs", type=int, help="number of worker processes")
+workshop_parser.add_argument("-r", "--report", help="path of the JSON report (default: OUTPUT_ROOT/workshop_report.json)")
+workshop_parser.add_argument("--no-cache", action="store_true", help="don't use the workshop scan and decrypt caches")
+workshop_parser.add_argument("--dedup-store", metavar="DIR", help="write identical decrypted files once into DIR and link them into the output")
+workshop_parser.add_argument("--link-mode", choices=["auto", "reflink", "hardlink", "copy"], default="auto", help="how files are linked from the dedup store (default: auto)")
+workshop_parser.add_argument("--dry-run", action="store_true", help="only plan the extraction: count files and bytes and estimate the time, the report lists every planned file")
+add_filter_arguments(workshop_parser)
+workshop_parser.add_argument("output_root", help="directory to store results, one folder per item")
+
 loglevels = ["FATAL", "INFO", "DEBUG"]
 
-if __name__ == "__main__":
-    args = parser.parse_args()
+# exit codes of the workshop command
+EXIT_OK = 0
+EXIT_ITEM_FAILED = 1
+EXIT_NO_WORKSHOP = 2
 
-    verbosity = args.verbosity if args.verbosity < len(loglevels) else len(loglevels) -1
+def setup_logging(verbosity: int):
+    verbosity = verbosity if verbosity < len(loglevels) else len(loglevels) -1
     loglevel=loglevels[verbosity]
 
     logging.basicConfig(level=loglevel, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+def format_bytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+def item_updated_time(item: dict) -> float:
+    if item.get("time_updated"):
+        return item["time_updated"]
+    try:
+        return os.stat(item["item_path"]).st_mtime
+    except OSError:
+        return 0
+
+def run_workshop(argv) -> int:
+    from Core.steam_integration import SteamIntegration
+    from Core.scan_cache import WorkshopScanCache
+    from Core.batch_extractor import BatchExtractor
+
+    args = workshop_parser.parse_args(argv)
+    setup_logging(args.verbosity)
+
+    steam_integration = SteamIntegration()
+    workshop_path = args.workshop_path
+    if workshop_path is None:
+        workshop_path = steam_integration.get_workshop_path(args.steam_path)
+    if not workshop_path or not os.path.isdir(workshop_path):
+        print("workshop folder not found, pass it with --workshop-path", file=sys.stderr)
+        return EXIT_NO_WORKSHOP
+
+    cache = None if args.no_cache else WorkshopScanCache()
+    items = steam_integration.scan_workshop_items(workshop_path, cache=cache)
+
+    if args.types:
+        items = [item for item in items if item.get("lpk_type") in args.types]
+    if args.updated_within is not None:
+        since = time.time() - args.updated_within * 86400
+        items = [item for item in items if item_updated_time(item) >= since]
+    print(f"{len(items)} workshop items selected for extraction")
+
+    def on_result(result, done, total, throughput):
+        status = "ok" if result["ok"] else "FAILED"
+        if args.dry_run:
+            print(f"[{done}/{total}] {status} {result['item_id']} {result['title']}: "
+                  f"{len(result['files'])} files, {format_bytes(result['bytes'])}, ~{result['estimated_time']:.1f}s")
+        else:
+            print(f"[{done}/{total}] {status} {result['item_id']} {result['title']} ({format_bytes(throughput)}/s)")
+        for error in result["errors"]:
+            print(f"    {error}")
+
+    start = time.time()
+    extractor = BatchExtractor(args.output_root, args.jobs, args.dedup_store, args.link_mode,
+                               None if args.no_cache else "decrypt_cache.db", get_filters(args))
+    results = extractor.run(items, on_result, args.dry_run)
+    failed = [result for result in results if not result["ok"]]
+
+    report_path = args.report or os.path.join(args.output_root, "workshop_report.json")
+    report = {
+        "workshop_path": workshop_path,
+        "output_root": os.path.abspath(args.output_root),
+        "elapsed": time.time() - start,
+        "summary": {
+            "items": len(results),
+            "ok": len(results) - len(failed),
+            "failed": len(failed),
+            "bytes": sum(result["size"] for result in results),
+            "cache_hits": sum(result["cache_hits"] for result in results),
+        },
+        "dedup": BatchExtractor.dedup_report(results),
+        "items": results,
+    }
+    if args.dry_run:
+        report["dry_run"] = {
+            "files": sum(len(result["files"]) for result in results),
+            "bytes": sum(result["bytes"] for result in results),
+            "estimated_time": extractor.estimated_time(results),
+        }
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, "w", encoding="utf8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.dry_run:
+        print(f"dry run: {report['dry_run']['files']} files, {format_bytes(report['dry_run']['bytes'])} would be written, "
+              f"estimated {report['dry_run']['estimated_time']:.1f}s with {extractor.max_workers} workers")
+    if report["dedup"]:
+        print(f"dedup store: {report['dedup']['unique']} unique of {report['dedup']['files']} files, "
+              f"{report['dedup']['bytes_saved'] / (1024 * 1024):.1f} MB saved")
+    print(f"{report['summary']['ok']} ok, {len(failed)} failed, report written to {report_path}")
+
+    return EXIT_ITEM_FAILED if failed else EXIT_OK
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["workshop"]:
+        sys.exit(run_workshop(sys.argv[2:]))
+
+    args = parser.parse_args()
+
+    setup_logging(args.verbosity)
     loader = LpkLoader(args.target_lpk, args.config)
+    loader.set_filter(**get_filters(args))
+
+    if args.dry_run:
+        plan = loader.plan(args.output_dir)
+        for f in plan["files"]:
+            print(f"{f['path']} ({f['size']} bytes)")
+        print(f"{len(plan['files'])} files, {format_bytes(plan['bytes'])} would be written, "
+              f"estimated {plan['estimated_time']:.1f}s at {format_bytes(plan['throughput'])}/s decrypt throughput")
+        sys.exit(0)
 
     loader.extract(args.output_dir)
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtCore import Qt, QCoreApplication
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
@@ -44,4 +45,6 @@ def run_application():
         return 1
 
 if __name__ == "__main__":
+    # batch extraction runs in a process pool, needed by frozen builds
+    multiprocessing.freeze_support()
     sys.exit(run_application())
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import base64
+import socket
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+websockets = pytest.importorskip("websockets")
+
+import GUI.web_server as web_server
+from GUI.web_server import PreviewClient
+
+CLIENTS = 50
+MESSAGES = 100
+# big enough to fill the socket buffers of a client that stops reading
+BLOB = "x" * 256 * 1024
+
+
+@pytest.fixture(scope="module")
+def port():
+    return web_server.start_server()
+
+
+def _stalled_client(port: int) -> socket.socket:
+    """A WebSocket handshake, then never read again"""
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    key = base64.b64encode(os.urandom(16)).decode()
+    sock.sendall(
+        f"GET /ws/preview HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+    )
+    sock.recv(1024)
+    return sock
+
+
+async def _wait_for_eof(sock: socket.socket, timeout: float):
+    """Drain ``sock`` until the server closes the connection"""
+    sock.setblocking(False)
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout
+    while True:
+        assert time.monotonic() < deadline, "the server kept the stalled connection open"
+        try:
+            data = await asyncio.wait_for(loop.sock_recv(sock, 1 << 16), deadline - time.monotonic())
+        except ConnectionResetError:
+            return
+        except asyncio.TimeoutError:
+            continue
+        if not data:
+            return
+
+
+async def _wait_for_clients(count: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while web_server.preview_client_count() != count:
+        assert time.monotonic() < deadline, f"{web_server.preview_client_count()} clients, expected {count}"
+        await asyncio.sleep(0.05)
+
+
+def test_stalled_client_does_not_delay_the_others(port):
+    async def receive(received):
+        async with websockets.connect(f"ws://127.0.0.1:{port}/ws/preview", max_size=None) as ws:
+            while True:
+                message = json.loads(await ws.recv())
+                received.append(message["seq"])
+                if message["seq"] == MESSAGES - 1:
+                    return
+
+    async def main():
+        stalled = _stalled_client(port)
+        try:
+            received = [[] for _ in range(CLIENTS - 1)]
+            tasks = [asyncio.create_task(receive(r)) for r in received]
+            await _wait_for_clients(CLIENTS, 10)
+
+            for seq in range(MESSAGES):
+                # distinct types, so nothing is coalesced away
+                await asyncio.wrap_future(web_server.broadcast({"type": f"test{seq}", "seq": seq, "blob": BLOB}))
+                await asyncio.sleep(0.005)
+            await asyncio.wait_for(asyncio.gather(*tasks), 30)
+            assert all(r == list(range(MESSAGES)) for r in received)
+
+            # the stalled client is dropped once a send exceeds its timeout, and its
+            # handler closes the connection instead of waiting for the peer forever
+            await _wait_for_clients(0, 10)
+            await _wait_for_eof(stalled, 15)
+        finally:
+            stalled.close()
+
+    asyncio.run(main())
+
+
+def test_push_replaces_in_place_and_drops_stale_model_messages():
+    client = PreviewClient(ws=None)
+    client.push("model", "load a")
+    client.push("setExpression", "a smile")
+    client.push("params", b"frame 1")
+    client.push("playMotion", "a idle")
+    client.push("params", b"frame 2")
+    assert list(client.pending.items()) == [
+        ("model", "load a"), ("setExpression", "a smile"), ("params", b"frame 2"), ("playMotion", "a idle"),
+    ]
+
+    client.push("model", "load b")
+    assert list(client.pending.items()) == [("params", b"frame 2"), ("model", "load b")]